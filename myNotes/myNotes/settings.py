@@ -94,6 +94,29 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# the weather cache is warmed by the prefetch_weather command,
+# so use a cache shared by all processes (e.g. Redis) in production
+
+CACHES = {
+    "default": {
+        "BACKEND": config.get(
+            'DJANGO_CACHE_BACKEND', "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config.get('DJANGO_CACHE_LOCATION', ""),
+    }
+}
+
+# Session users are loaded with their profiles and cached for USER_CACHE_TTL seconds.
+# ModelBackend keeps sessions created before it working until the next login.
+AUTHENTICATION_BACKENDS = [
+    "uProfile.backends.ProfileBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+USER_CACHE_ALIAS = config.get('DJANGO_USER_CACHE_ALIAS', "default")
+USER_CACHE_TTL = int(config.get('DJANGO_USER_CACHE_TTL', 300))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -131,6 +154,55 @@ LOGIN_REDIRECT_URL = "main"
 WEATHER_BASE_URL = config.get('DJANGO_WEATHER_BASE_URL', "secret")
 WEATHER_API_KEY = config.get('DJANGO_WEATHER_API_KEY', "secret")
 
+# Weather info is served from the cache for WEATHER_CACHE_TTL seconds,
+# then served stale for WEATHER_CACHE_STALE_TTL seconds while it is refreshed
+WEATHER_CACHE_ALIAS = config.get('DJANGO_WEATHER_CACHE_ALIAS', "default")
+WEATHER_CACHE_TTL = int(config.get('DJANGO_WEATHER_CACHE_TTL', 600))
+WEATHER_CACHE_STALE_TTL = int(config.get('DJANGO_WEATHER_CACHE_STALE_TTL', 3600))
+WEATHER_CACHE_NOT_FOUND_TTL = int(config.get('DJANGO_WEATHER_CACHE_NOT_FOUND_TTL', 3600))
+WEATHER_CACHE_LOCK_TTL = 30
+
+# The async weather client gives up after WEATHER_LATENCY_BUDGET seconds
+WEATHER_LATENCY_BUDGET = float(config.get('DJANGO_WEATHER_LATENCY_BUDGET', 1.5))
+WEATHER_POOL_SIZE = int(config.get('DJANGO_WEATHER_POOL_SIZE', 20))
+
+# Weather is not requested for WEATHER_BREAKER_COOLDOWN seconds
+# after WEATHER_BREAKER_THRESHOLD failed requests in a row
+WEATHER_BREAKER_THRESHOLD = int(config.get('DJANGO_WEATHER_BREAKER_THRESHOLD', 5))
+WEATHER_BREAKER_COOLDOWN = int(config.get('DJANGO_WEATHER_BREAKER_COOLDOWN', 30))
+
+# Serve the main page with the async view when deployed with ASGI
+NOTES_ASYNC_MAIN_VIEW = config.get('DJANGO_NOTES_ASYNC_MAIN_VIEW', "False") == "True"
+
+# Render the main page without waiting for weather info
+# and load the weather widget from the separate endpoint
+NOTES_DEFERRED_WEATHER = config.get('DJANGO_NOTES_DEFERRED_WEATHER', "True") == "True"
+
+# Rendered entries of the pages are cached until the user changes them
+# and at most for NOTES_CACHE_TTL seconds
+NOTES_CACHE_ALIAS = config.get('DJANGO_NOTES_CACHE_ALIAS', "default")
+NOTES_CACHE_TTL = int(config.get('DJANGO_NOTES_CACHE_TTL', 3600))
+
+# Number of entries on a page of the journal and of all tasks
+NOTES_PAGE_SIZE = 50
+
+# Number of titles suggested while typing the search query
+NOTES_AUTOCOMPLETE_LIMIT = 10
+# Number of users and scopes whose titles are indexed in memory for suggestions
+# on databases without pg_trgm, the least recently used ones are dropped
+NOTES_AUTOCOMPLETE_INDEX_SIZE = 1000
+
+# Calendar apps re-request the feed of tasks after NOTES_FEED_MAX_AGE seconds
+NOTES_FEED_MAX_AGE = 300
+
+# Descriptions of at least NOTES_DESC_COMPRESSION_THRESHOLD bytes are stored
+# compressed by zlib when saved with NOTES_DESC_COMPRESSION turned on
+NOTES_DESC_COMPRESSION = config.get('DJANGO_NOTES_DESC_COMPRESSION', "False") == "True"
+NOTES_DESC_COMPRESSION_THRESHOLD = int(
+    config.get('DJANGO_NOTES_DESC_COMPRESSION_THRESHOLD', 8192)
+)
+NOTES_DESC_COMPRESSION_LEVEL = 6
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
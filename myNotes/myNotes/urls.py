@@ -23,6 +23,7 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("auth/", include('auth.urls')),
     path("notes/", include('notes.urls')),
+    path("api/v1/", include('notes.api_urls')),
     path("profile/", include('uProfile.urls')),
     path("", TemplateView.as_view(template_name="templates/home.html"), name="home"),
 ]
@@ -0,0 +1,372 @@
+"""
+    Define views of the JSON API for notes
+"""
+import json
+import secrets
+from datetime import date, datetime
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.forms.models import model_to_dict
+from django.http import HttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from uProfile.models import Profile
+
+from .batch import BatchOperationError, apply_batch_operation
+from .calendar_counts import MAX_CALENDAR_DAYS, get_day_counts
+from .compression import read_text
+from .filters import FilterError, filter_notes
+from .forms import CreateNoteForm, UpdateNoteForm
+from .models import Note
+from .pagination import InvalidCursor, paginate_by_keyset
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# fields of entries returned by the API
+API_FIELDS = (
+    "id",
+    "title",
+    "desc",
+    "isComplete",
+    "create_at",
+    "deadline",
+    "weight",
+    "type",
+)
+
+
+# prefix of the API token in the Authorization header
+TOKEN_KEYWORD = "Token"
+
+
+class ApiJSONEncoder(DjangoJSONEncoder):
+    """Encode datetimes like orjson does: ISO 8601 with microseconds and offset"""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def dump_json(data):
+    """Encodes data to JSON with orjson if it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, cls=ApiJSONEncoder, separators=(",", ":"))
+
+
+def json_response(data, status=200):
+    """Returns the response with data encoded to JSON"""
+    return HttpResponse(dump_json(data), status=status, content_type="application/json")
+
+
+def error_response(message, status=400, errors=None):
+    """Returns the response with the error description"""
+    data = {"error": message}
+    if errors is not None:
+        data["errors"] = errors
+    return json_response(data, status=status)
+
+
+def get_values_fields(fields):
+    """Returns fields of values() loading compressed descriptions too"""
+    if "desc" in fields:
+        return [*fields, "desc_data"]
+    return fields
+
+
+def get_row_fields(row, fields):
+    """Returns the requested fields of the values() row"""
+    if "desc" in fields:
+        row["desc"] = read_text(row["desc"], row["desc_data"])
+    return {field: row[field] for field in fields}
+
+
+def serialize_note(note):
+    """Returns the API fields of the entry"""
+    return {field: getattr(note, field) for field in API_FIELDS}
+
+
+def is_note_form_valid(form):
+    """Validate the form of the entry requiring the title like the pages do"""
+    if form.is_valid() and not form.cleaned_data.get("title"):
+        form.add_error("title", "Title is required field!")
+    return not form.errors
+
+
+def get_fields(request):
+    """Returns fields requested by the fields parameter or all API fields"""
+    requested = request.GET.get("fields", "")
+    if not requested:
+        return list(API_FIELDS)
+    return [field for field in API_FIELDS if field in requested.split(",")]
+
+
+def get_request_token(request):
+    """Returns the API token of the Authorization header or None"""
+    keyword, _, token = request.headers.get("Authorization", "").partition(" ")
+    if keyword != TOKEN_KEYWORD:
+        return None
+    return token.strip()
+
+
+def get_token_user(token):
+    """Returns the active user with the API token or None"""
+    if not token:
+        return None
+    profile = (
+        Profile.objects.select_related("user")
+        .filter(api_token=token, user__is_active=True)
+        .first()
+    )
+    return profile and profile.user
+
+
+class ApiCsrfCheck(CsrfViewMiddleware):
+    """Check the CSRF token of the request like the middleware does"""
+
+    def _reject(self, request, reason):
+        return reason
+
+    def get_failure_reason(self, request):
+        """Returns the reason of the CSRF check failure or None"""
+        self.process_request(request)
+        return self.process_view(request, None, (), {})
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ApiLoginRequiredMixin(LoginRequiredMixin):
+    """
+    Authenticate API clients by the token of the Authorization header
+    ("Token <token>"), which needs no CSRF token, or by the session
+    checking the CSRF token of unsafe requests like the pages do.
+    Respond with 401 to anonymous users instead of redirecting them to login.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = get_request_token(request)
+        if token is not None:
+            user = get_token_user(token)
+            if user is None:
+                return error_response("Invalid token", status=401)
+            request.user = user
+        elif request.user.is_authenticated:
+            reason = ApiCsrfCheck(lambda request: None).get_failure_reason(request)
+            if reason is not None:
+                return error_response(f"CSRF check failed: {reason}", status=403)
+        return super().dispatch(request, *args, **kwargs)
+
+    def handle_no_permission(self):
+        return error_response("Authentication required", status=401)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ApiTokenView(View):
+    """
+    Give the API token to the client posting the username and password
+    {"username": ..., "password": ...}, or revoke the token of the request.
+    """
+
+    http_method_names = ["post", "delete", "options"]
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return error_response("Invalid JSON")
+        if not isinstance(data, dict):
+            return error_response("Invalid JSON")
+
+        user = authenticate(
+            request, username=data.get("username"), password=data.get("password")
+        )
+        if user is None:
+            return error_response("Invalid username or password", status=401)
+
+        profile = user.profile
+        if not profile.api_token:
+            profile.api_token = secrets.token_urlsafe(32)
+            profile.save(update_fields=["api_token"])
+        return json_response({"token": profile.api_token})
+
+    def delete(self, request):
+        user = get_token_user(get_request_token(request))
+        if user is None:
+            return error_response("Invalid token", status=401)
+        user.profile.api_token = None
+        user.profile.save(update_fields=["api_token"])
+        return HttpResponse(status=204)
+
+
+class NoteCollectionApiView(ApiLoginRequiredMixin, View):
+    """
+    List entries of the user filtered like in the pages
+    or create a new entry.
+    """
+
+    def get(self, request):
+        notes = Note.objects.for_user(request.user)
+
+        try:
+            notes = filter_notes(notes, request.GET)
+        except FilterError as err:
+            return error_response(str(err))
+
+        # ordering data by creation date or by relevance of search results
+        ordering = ["-create_at", "-id"]
+        if request.GET.get("search", ""):
+            ordering = ["-rank", *ordering]
+
+        # load only the requested fields and the fields of the cursor
+        fields = get_fields(request)
+        ordering_fields = [field_name.lstrip("-") for field_name in ordering]
+        notes = notes.values(
+            *get_values_fields(fields),
+            *[f for f in ordering_fields if f not in fields],
+        )
+
+        try:
+            rows, next_cursor = paginate_by_keyset(
+                notes,
+                ordering,
+                request.GET.get("cursor", ""),
+                settings.NOTES_PAGE_SIZE,
+            )
+        except InvalidCursor:
+            return error_response("Invalid cursor")
+
+        results = [get_row_fields(row, fields) for row in rows]
+        return json_response({"results": results, "next_cursor": next_cursor})
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return error_response("Invalid JSON")
+        if not isinstance(data, dict):
+            return error_response("Invalid JSON")
+
+        form = CreateNoteForm(data)
+        if not is_note_form_valid(form):
+            return error_response("Invalid note", errors=form.errors.get_json_data())
+
+        form.instance.user = request.user
+        note = form.save()
+        return json_response(serialize_note(note), status=201)
+
+
+class NoteApiView(ApiLoginRequiredMixin, View):
+    """Show, update or delete the entry of the user by id"""
+
+    http_method_names = ["get", "patch", "delete", "options"]
+
+    def get_note(self, request, pk):
+        """Returns the entry of the user or None"""
+        return Note.objects.for_user(request.user).filter(pk=pk).first()
+
+    def get(self, request, pk):
+        fields = get_fields(request)
+        note = (
+            Note.objects.for_user(request.user)
+            .filter(pk=pk)
+            .values(*get_values_fields(fields))
+            .first()
+        )
+        if note is None:
+            return error_response("Note not found", status=404)
+        return json_response(get_row_fields(note, fields))
+
+    def patch(self, request, pk):
+        note = self.get_note(request, pk)
+        if note is None:
+            return error_response("Note not found", status=404)
+
+        try:
+            changes = json.loads(request.body)
+        except ValueError:
+            return error_response("Invalid JSON")
+        if not isinstance(changes, dict):
+            return error_response("Invalid JSON")
+
+        # update only the passed fields keeping the others
+        data = model_to_dict(note, fields=UpdateNoteForm.Meta.fields)
+        data.update(changes)
+        form = UpdateNoteForm(data, instance=note)
+        if not is_note_form_valid(form):
+            return error_response("Invalid note", errors=form.errors.get_json_data())
+
+        note = form.save()
+        return json_response(serialize_note(note))
+
+    def delete(self, request, pk):
+        deleted, _ = Note.objects.for_user(request.user).filter(pk=pk).delete()
+        if not deleted:
+            return error_response("Note not found", status=404)
+        return HttpResponse(status=204)
+
+
+class NoteBatchApiView(ApiLoginRequiredMixin, View):
+    """
+    Apply the operation to many entries of the user at once:
+    {"ids": [...], "operation": "complete", "value": ...}
+    """
+
+    http_method_names = ["post", "options"]
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return error_response("Invalid JSON")
+        if not isinstance(data, dict):
+            return error_response("Invalid JSON")
+
+        try:
+            results = apply_batch_operation(
+                request.user, data.get("ids"), data.get("operation"), data.get("value")
+            )
+        except BatchOperationError as err:
+            return error_response(str(err))
+
+        return json_response(
+            {
+                "results": [
+                    {"id": note_id, "result": result}
+                    for note_id, result in results.items()
+                ]
+            }
+        )
+
+
+class CalendarApiView(ApiLoginRequiredMixin, View):
+    """
+    List numbers of tasks of the user by days of the range
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD, days without tasks are omitted.
+    """
+
+    http_method_names = ["get", "options"]
+
+    def get(self, request):
+        try:
+            start_date = date.fromisoformat(request.GET.get("start", ""))
+            end_date = date.fromisoformat(request.GET.get("end", ""))
+        except ValueError:
+            return error_response("Invalid start or end date")
+        if start_date > end_date:
+            return error_response("The start date is after the end date")
+        if (end_date - start_date).days >= MAX_CALENDAR_DAYS:
+            return error_response(f"The range is longer than {MAX_CALENDAR_DAYS} days")
+
+        day_counts = get_day_counts(request.user, start_date, end_date)
+        return json_response(
+            {"days": [{"date": day, **counts} for day, counts in day_counts.items()]}
+        )
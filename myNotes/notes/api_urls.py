@@ -0,0 +1,18 @@
+"""Define app JSON API url handlers"""
+from django.urls import path
+
+from .api import (
+    ApiTokenView,
+    CalendarApiView,
+    NoteApiView,
+    NoteBatchApiView,
+    NoteCollectionApiView,
+)
+
+urlpatterns = [
+    path("token/", ApiTokenView.as_view(), name="api-token"),
+    path("notes/", NoteCollectionApiView.as_view(), name="api-notes"),
+    path("notes/batch/", NoteBatchApiView.as_view(), name="api-notes-batch"),
+    path("notes/<int:pk>/", NoteApiView.as_view(), name="api-note"),
+    path("calendar/", CalendarApiView.as_view(), name="api-calendar"),
+]
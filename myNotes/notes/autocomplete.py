@@ -0,0 +1,105 @@
+"""Define search-as-you-type suggestions of note titles"""
+import bisect
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Note
+from .search import is_postgresql
+
+
+class TitlePrefixIndex:
+    """
+    In-memory index of the titles of each user matching the query
+    with the beginning of any word of the title.
+    Used instead of the trigram index on databases without pg_trgm (e.g. SQLite).
+    Keeps titles of max_size users and scopes used last.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _build(self, queryset):
+        entries = []
+        for note_id, title in queryset.values_list("id", "title").iterator():
+            folded_title = (title or "").casefold()
+            for position, char in enumerate(folded_title):
+                if char.isalnum() and (
+                    position == 0 or not folded_title[position - 1].isalnum()
+                ):
+                    entries.append((folded_title[position:], note_id, title))
+        entries.sort()
+        return entries
+
+    def search(self, key, queryset, query, limit):
+        """Returns up to limit (id, title) pairs of the queryset starting with the query"""
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is not None:
+                self._entries.move_to_end(key)
+        if entries is None:
+            entries = self._build(queryset)
+            with self._lock:
+                self._entries[key] = entries
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        query = query.casefold()
+        results = {}
+        position = bisect.bisect_left(entries, (query,))
+        while position < len(entries) and len(results) < limit:
+            folded_title, note_id, title = entries[position]
+            if not folded_title.startswith(query):
+                break
+            results.setdefault(note_id, title)
+            position += 1
+        return list(results.items())
+
+    def invalidate(self, user_id):
+        """Drops the indexed titles of the user"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+
+title_prefix_index = TitlePrefixIndex(settings.NOTES_AUTOCOMPLETE_INDEX_SIZE)
+
+
+def get_word_prefix_regex(query):
+    """Returns the PostgreSQL regex matching titles with a word starting with the query"""
+    return r"\m" + re.escape(query)
+
+
+def get_title_suggestions(user, scope, query, limit):
+    """Returns up to limit (id, title) pairs of the user entries matching the query"""
+    queryset = Note.objects.for_user(user)
+    if scope == "notes":
+        queryset = queryset.journal()
+    else:
+        queryset = queryset.tasks()
+
+    if not is_postgresql(queryset):
+        return title_prefix_index.search((user.pk, scope), queryset, query, limit)
+
+    # titles are matched by word prefixes like in TitlePrefixIndex,
+    # the trigram index of titles serves the regex
+    return list(
+        queryset.filter(title__iregex=get_word_prefix_regex(query))
+        .annotate(similarity=TrigramWordSimilarity(query, "title"))
+        .order_by("-similarity", "-create_at")
+        .values_list("id", "title")[:limit]
+    )
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_title_prefix_index(sender, instance, **kwargs):
+    """Drop the indexed titles of the user when the entries are changed"""
+    title_prefix_index.invalidate(instance.user_id)
@@ -0,0 +1,110 @@
+"""Define operations applied to many entries at once"""
+from datetime import date
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from utils.constants import Weight
+
+from .autocomplete import title_prefix_index
+from .conditional import mark_notes_changed
+from .models import Note
+
+# max number of entries changed by one operation
+MAX_BATCH_SIZE = 500
+
+
+class BatchOperationError(Exception):
+    """Raised when the batch operation can not be applied"""
+
+
+def parse_deadline(value):
+    """Returns the deadline date from the ISO string"""
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError as err:
+        raise BatchOperationError("Invalid deadline") from err
+
+
+def parse_weight(value):
+    """Returns the weight code from the code or the label"""
+    weights_by_label = {label: weight for weight, label in Weight.choices}
+    if isinstance(value, str) and value in weights_by_label:
+        return weights_by_label[value]
+    try:
+        return Weight(int(value))
+    except (TypeError, ValueError) as err:
+        raise BatchOperationError("Invalid weight") from err
+
+
+# operations mapped to the fields they update and the parsers of the value
+UPDATE_OPERATIONS = {
+    "complete": lambda value: {"isComplete": True},
+    "uncomplete": lambda value: {"isComplete": False},
+    "set_deadline": lambda value: {"deadline": parse_deadline(value)},
+    "set_weight": lambda value: {"weight": parse_weight(value)},
+}
+
+OPERATIONS = (*UPDATE_OPERATIONS, "delete")
+
+
+def parse_ids(ids):
+    """Returns the list of unique entry ids"""
+    if not isinstance(ids, list) or not ids:
+        raise BatchOperationError("ids must be a non-empty list")
+    if len(ids) > MAX_BATCH_SIZE:
+        raise BatchOperationError(f"No more than {MAX_BATCH_SIZE} ids are allowed")
+    try:
+        return list(dict.fromkeys(int(note_id) for note_id in ids))
+    except (TypeError, ValueError) as err:
+        raise BatchOperationError("ids must be integers") from err
+
+
+def delete_user_notes(user, ids):
+    """
+    Delete the user entries with the ids by one DELETE query.
+    QuerySet.delete() loads the entries to send post_delete for each of them.
+    Nothing refers to the entries, so there is nothing to cascade.
+    """
+    if not ids:
+        return
+    quote_name = connection.ops.quote_name
+    table = quote_name(Note._meta.db_table)
+    user_column = quote_name(Note._meta.get_field("user").column)
+    id_column = quote_name(Note._meta.pk.column)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE {user_column} = %s "
+            f"AND {id_column} IN ({placeholders})",
+            [user.pk, *ids],
+        )
+
+
+def apply_batch_operation(user, ids, operation, value=None):
+    """
+    Apply the operation to the user entries with the ids
+    by a single UPDATE or DELETE in one transaction.
+    Returns results by id: 'ok' or 'not_found'.
+    """
+    if operation not in OPERATIONS:
+        raise BatchOperationError(f"operation must be one of: {', '.join(OPERATIONS)}")
+    ids = parse_ids(ids)
+    changes = UPDATE_OPERATIONS[operation](value) if operation != "delete" else None
+
+    with transaction.atomic():
+        notes = Note.objects.for_user(user).filter(pk__in=ids)
+        found_ids = set(notes.select_for_update().values_list("id", flat=True))
+        if operation == "delete":
+            delete_user_notes(user, found_ids)
+            # the work of the post_delete receivers of the entries
+            title_prefix_index.invalidate(user.pk)
+        else:
+            # update() skips auto_now of updated_at
+            Note.objects.filter(pk__in=found_ids).update(
+                **changes, updated_at=timezone.now()
+            )
+        # the bulk queries send no signals
+        mark_notes_changed(user.pk)
+
+    return {note_id: "ok" if note_id in found_ids else "not_found" for note_id in ids}
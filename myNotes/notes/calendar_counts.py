@@ -0,0 +1,87 @@
+"""Define the calendar of numbers of the user tasks by days"""
+import calendar
+import math
+from datetime import date
+
+from django.db.models import Count, Q
+
+from utils.constants import Weight
+
+from .models import Note
+
+# numbers of tasks of a day counted by the grouped query
+DAY_COUNTS = {
+    "total": Count("id"),
+    "open": Count("id", filter=Q(isComplete=False)),
+    "completed": Count("id", filter=Q(isComplete=True)),
+    "high": Count("id", filter=Q(weight=Weight.HIGH)),
+    "normal": Count("id", filter=Q(weight=Weight.NORMAL)),
+    "low": Count("id", filter=Q(weight=Weight.LOW)),
+}
+
+# max number of days of the requested range
+MAX_CALENDAR_DAYS = 366
+
+# number of heatmap colors of days with tasks
+HEAT_LEVELS = 4
+
+
+def get_day_counts(user, start_date, end_date):
+    """
+    Returns numbers of tasks of the user by days of the range
+    counted by one grouped query. Days without tasks are missing.
+    """
+    rows = (
+        Note.objects.for_user(user)
+        .tasks()
+        .between(start_date, end_date)
+        # the default ordering of the model would be added to GROUP BY
+        .order_by("deadline")
+        .values("deadline")
+        .annotate(**DAY_COUNTS)
+    )
+    return {row.pop("deadline"): row for row in rows}
+
+
+def get_heat_level(total, max_total):
+    """Returns the heatmap color of the day from 0 (no tasks) to HEAT_LEVELS"""
+    if not total:
+        return 0
+    return math.ceil(total / max_total * HEAT_LEVELS)
+
+
+def get_calendar_months(start_date, end_date, day_counts):
+    """
+    Returns months of the range with weeks of days starting on Monday.
+    Days out of the month are None, days have numbers of tasks and heat levels.
+    """
+    max_total = max((counts["total"] for counts in day_counts.values()), default=0)
+    empty_counts = dict.fromkeys(DAY_COUNTS, 0)
+    months = []
+    month_date = start_date.replace(day=1)
+    while month_date <= end_date:
+        weeks = []
+        for week in calendar.Calendar().monthdatescalendar(
+            month_date.year, month_date.month
+        ):
+            days = []
+            for day in week:
+                if day.month != month_date.month:
+                    days.append(None)
+                    continue
+                counts = day_counts.get(day, empty_counts)
+                days.append(
+                    {
+                        "date": day,
+                        "counts": counts,
+                        "heat": get_heat_level(counts["total"], max_total),
+                    }
+                )
+            weeks.append(days)
+        months.append({"date": month_date, "weeks": weeks})
+
+        if month_date.month == 12:
+            month_date = date(month_date.year + 1, 1, 1)
+        else:
+            month_date = month_date.replace(month=month_date.month + 1)
+    return months
@@ -0,0 +1,77 @@
+"""Define optional compression of large descriptions of entries"""
+import zlib
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+
+def compress_text(text):
+    """
+    Returns the text compressed by zlib or None if compression is disabled,
+    the text is shorter than the threshold or does not get smaller.
+    """
+    if not settings.NOTES_DESC_COMPRESSION or not text:
+        return None
+    data = text.encode()
+    if len(data) < settings.NOTES_DESC_COMPRESSION_THRESHOLD:
+        return None
+    compressed = zlib.compress(data, settings.NOTES_DESC_COMPRESSION_LEVEL)
+    return compressed if len(compressed) < len(data) else None
+
+
+def decompress_text(data):
+    """Returns the text compressed by compress_text"""
+    return zlib.decompress(data).decode()
+
+
+def read_text(text, data):
+    """Returns the text of the values() row kept as it is or compressed in data"""
+    return decompress_text(data) if data is not None else text
+
+
+class CompressedTextAttribute(DeferredAttribute):
+    """Decompress the text of the loaded instance on the first access"""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        attname = self.field.attname
+        if attname not in instance.__dict__ and getattr(
+            instance, self.field.flag_field
+        ):
+            text = decompress_text(getattr(instance, self.field.data_field))
+            instance.__dict__[attname] = text
+            # the text was not changed by decompressing it (see DirtyFieldsMixin)
+            loaded_values = getattr(instance, "_loaded_values", {})
+            if attname in loaded_values:
+                loaded_values[attname] = text
+            return text
+        return super().__get__(instance, cls)
+
+
+class CompressibleTextField(models.TextField):
+    """
+    Text field keeping NULL in its column when the flag field is set
+    and the text is stored compressed in the data field.
+    The model removes the NULL of compressed texts from loaded instances,
+    so the text is decompressed only if it is read.
+    """
+
+    descriptor_class = CompressedTextAttribute
+
+    def __init__(self, *args, flag_field, data_field, **kwargs):
+        self.flag_field = flag_field
+        self.data_field = data_field
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["flag_field"] = self.flag_field
+        kwargs["data_field"] = self.data_field
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        if getattr(model_instance, self.flag_field):
+            return None
+        return super().pre_save(model_instance, add)
@@ -0,0 +1,113 @@
+"""Define conditional GET of pages by the last change of the user entries"""
+import hashlib
+from datetime import date
+
+from django.contrib.messages import get_messages
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from uProfile.backends import invalidate_cached_user
+from uProfile.models import Profile
+
+from .models import Note
+
+# fields which are not shown by the pages, e.g. the storage of the description
+UNRENDERED_FIELDS = {"search_vector", "desc_compressed", "desc_data"}
+
+
+def mark_notes_changed(user_id):
+    """Move the last change of the user entries to now"""
+    Profile.objects.filter(user_id=user_id).update(notes_changed_at=timezone.now())
+    # the update does not send signals
+    invalidate_cached_user(user_id)
+
+
+def get_notes_changed_at(user):
+    """
+    Returns the last change of the user entries by its own query once per request.
+    The profile of the cached user may be older, since other processes
+    do not clear their copies of it when the entries are changed.
+    """
+    if not hasattr(user, "_notes_changed_at"):
+        user._notes_changed_at = (
+            Profile.objects.filter(user_id=user.pk)
+            .values_list("notes_changed_at", flat=True)
+            .first()
+        )
+    return user._notes_changed_at
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def mark_note_user_changed(sender, instance, **kwargs):
+    """Mark entries of the user as changed when the entry is saved or deleted"""
+    # unchanged entries are not saved (see DirtyFieldsMixin)
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and not set(update_fields) - UNRENDERED_FIELDS:
+        return
+    if instance.user_id is not None:
+        mark_notes_changed(instance.user_id)
+
+
+class ConditionalPageMixin:
+    """
+    Answer 304 to repeated GET requests of the page of the user entries
+    (back/forward navigation, polling tabs) until the entries are changed,
+    without querying the entries and rendering the template.
+    """
+
+    def get_page_validators(self):
+        """
+        Returns the ETag and the last modification time of the page or None.
+        The ETag depends on the last change of the user entries, the page url,
+        the session (pages contain the CSRF token) and today's date.
+        """
+        if not hasattr(self, "_page_validators"):
+            self._page_validators = None
+            changed_at = get_notes_changed_at(self.request.user)
+            if changed_at is not None:
+                page_key = ":".join(
+                    [
+                        str(self.request.user.pk),
+                        changed_at.isoformat(),
+                        self.request.get_full_path(),
+                        self.request.session.session_key or "",
+                        date.today().isoformat(),
+                    ]
+                )
+                etag = quote_etag(hashlib.md5(page_key.encode()).hexdigest())
+                self._page_validators = (etag, changed_at.timestamp())
+        return self._page_validators
+
+    def get_not_modified_response(self):
+        """Returns the 304 response if the page the client has is up to date"""
+        validators = self.get_page_validators()
+        if validators is None:
+            return None
+        etag, last_modified = validators
+        return get_conditional_response(
+            self.request, etag=etag, last_modified=int(last_modified)
+        )
+
+    def add_page_validators(self, response):
+        """Add the ETag and Last-Modified headers to the response of the page"""
+        validators = self.get_page_validators()
+        if validators is not None and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response.headers.setdefault("ETag", etag)
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+            # browsers have to check the page before showing it from their cache
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        if get_messages(request):
+            # the page shows the messages once, so the client can not reuse it
+            return super().get(request, *args, **kwargs)
+        response = self.get_not_modified_response()
+        if response is not None:
+            return self.add_page_validators(response)
+        return self.add_page_validators(super().get(request, *args, **kwargs))
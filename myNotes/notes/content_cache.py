@@ -0,0 +1,90 @@
+"""Define the cache of rendered entries of the pages versioned by user changes"""
+import hashlib
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .conditional import get_notes_changed_at
+
+CONTENT_CACHE_PREFIX = "notes"
+CONTENT_CACHE_STATS = ("hits", "misses")
+
+
+def get_content_cache():
+    """Returns the cache used for storing rendered entries"""
+    return caches[settings.NOTES_CACHE_ALIAS]
+
+
+def count_content_cache(stat):
+    """Increments the content cache counter"""
+    cache = get_content_cache()
+    key = f"{CONTENT_CACHE_PREFIX}:stats:{stat}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        # the first count or the counter was evicted
+        cache.set(key, 1, timeout=None)
+
+
+def get_content_cache_stats():
+    """Returns the content cache hit/miss counters"""
+    cache = get_content_cache()
+    keys = {
+        f"{CONTENT_CACHE_PREFIX}:stats:{stat}": stat for stat in CONTENT_CACHE_STATS
+    }
+    values = cache.get_many(keys.keys())
+    return {stat: values.get(key, 0) for key, stat in keys.items()}
+
+
+def get_content_cache_key(user, view_name, url):
+    """
+    Returns the cache key of the entries of the page by the user, the view,
+    the url with the query and the version of the user entries.
+    The version is the last change of the entries moved by the Note signals,
+    so new keys replace old ones and nothing has to be invalidated.
+    """
+    version = get_notes_changed_at(user).isoformat()
+    params = ":".join([str(user.pk), view_name, url, date.today().isoformat(), version])
+    return f"{CONTENT_CACHE_PREFIX}:content:{hashlib.md5(params.encode()).hexdigest()}"
+
+
+class CachedContentMixin:
+    """
+    Render the entries of the page with content_template_name
+    and reuse the html until the entries of the user are changed.
+    Entries are queried in get_content_data on cache misses only.
+    """
+
+    content_template_name = None
+
+    def get_content_data(self, context):
+        """Returns the context of the content template querying the entries"""
+        return {}
+
+    def get_content(self, context):
+        """Returns the html of the entries from the cache or renders it"""
+        cache = get_content_cache()
+        key = get_content_cache_key(
+            self.request.user,
+            self.request.resolver_match.view_name,
+            self.request.get_full_path(),
+        )
+        content = cache.get(key)
+        if content is not None:
+            count_content_cache("hits")
+            return mark_safe(content)
+
+        count_content_cache("misses")
+        context.update(self.get_content_data(context))
+        content = render_to_string(
+            self.content_template_name, context, request=self.request
+        )
+        cache.set(key, content, timeout=settings.NOTES_CACHE_TTL)
+        return content
+
+    def render_to_response(self, context, **response_kwargs):
+        context["entries_content"] = self.get_content(context)
+        return super().render_to_response(context, **response_kwargs)
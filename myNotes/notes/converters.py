@@ -0,0 +1,20 @@
+"""Define converters of the url parameters"""
+
+# weeks away from the current one shown by the main page (about 190 years)
+MAX_WEEK_COUNT = 10000
+
+
+class WeekCountConverter:
+    """Match the signed number of weeks away from the current one"""
+
+    regex = "-?[0-9]+"
+
+    def to_python(self, value):
+        week_count = int(value)
+        # dates of the weeks further away can not be represented
+        if abs(week_count) > MAX_WEEK_COUNT:
+            raise ValueError(f"Week count out of range: {value}")
+        return week_count
+
+    def to_url(self, value):
+        return str(value)
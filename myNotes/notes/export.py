@@ -0,0 +1,152 @@
+"""Define streaming export of entries"""
+import csv
+import io
+import json
+from datetime import timedelta, timezone
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from utils.constants import NoteType, Weight
+
+from .compression import read_text
+
+# columns of exported entries
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "desc",
+    "isComplete",
+    "create_at",
+    "deadline",
+    "weight",
+    "type",
+)
+
+# number of rows fetched from the database at once
+EXPORT_CHUNK_SIZE = 2000
+
+# number of rows written to one chunk of the response
+ROWS_PER_CHUNK = 500
+
+# max number of octets of iCalendar lines
+ICS_LINE_LENGTH = 75
+
+# weights mapped to iCalendar priorities (1 is the highest one)
+ICS_PRIORITIES = {Weight.HIGH: 1, Weight.NORMAL: 5, Weight.LOW: 9}
+
+
+def iter_export_rows(notes):
+    """Yields exported entries as dicts keeping memory flat for any number of rows"""
+    weights = dict(Weight.choices)
+    types = dict(NoteType.choices)
+    rows = notes.order_by("create_at", "id").values_list(*EXPORT_FIELDS, "desc_data")
+    for *values, desc_data in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row = dict(zip(EXPORT_FIELDS, values))
+        row["desc"] = read_text(row["desc"], desc_data)
+        # export labels like the pages show them
+        row["weight"] = weights.get(row["weight"], row["weight"])
+        row["type"] = types.get(row["type"], row["type"])
+        yield row
+
+
+def iter_csv(notes):
+    """Yields chunks of the CSV export"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for number, row in enumerate(iter_export_rows(notes), start=1):
+        row["create_at"] = row["create_at"].isoformat()
+        writer.writerow(row)
+        if number % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(notes):
+    """Yields chunks of the newline-delimited JSON export"""
+    lines = []
+    for row in iter_export_rows(notes):
+        lines.append(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+        if len(lines) == ROWS_PER_CHUNK:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def escape_ics_text(value):
+    """Returns the text escaped for the iCalendar property value"""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_ics_line(line):
+    """Returns the iCalendar content line folded to lines of ICS_LINE_LENGTH octets"""
+    if len(line.encode()) <= ICS_LINE_LENGTH:
+        return line + "\r\n"
+
+    parts = []
+    part_start, part_length = 0, 0
+    for position, char in enumerate(line):
+        char_length = len(char.encode())
+        if part_length + char_length > ICS_LINE_LENGTH:
+            parts.append(line[part_start:position])
+            # continuation lines start with a space
+            part_start, part_length = position, 1
+        part_length += char_length
+    parts.append(line[part_start:])
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def iter_ics(notes):
+    """Yields chunks of the iCalendar file with an all-day event for each entry"""
+    types = dict(NoteType.choices)
+    rows = notes.order_by("deadline", "id").values_list(
+        "id", "title", "desc", "desc_data", "deadline", "weight", "type", "updated_at"
+    )
+
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//MyNotes//Notes//EN",
+        "CALSCALE:GREGORIAN",
+        "X-WR-CALNAME:MyNotes",
+    ]
+    for number, row in enumerate(rows.iterator(chunk_size=EXPORT_CHUNK_SIZE), start=1):
+        note_id, title, desc, desc_data, deadline, weight, note_type, updated_at = row
+        desc = read_text(desc, desc_data)
+        updated_at = updated_at.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:note-{note_id}@mynotes",
+            f"DTSTAMP:{updated_at}",
+            f"LAST-MODIFIED:{updated_at}",
+            f"DTSTART;VALUE=DATE:{deadline.strftime('%Y%m%d')}",
+            f"DTEND;VALUE=DATE:{(deadline + timedelta(days=1)).strftime('%Y%m%d')}",
+            f"SUMMARY:{escape_ics_text(title or '')}",
+        ]
+        if desc:
+            lines.append(f"DESCRIPTION:{escape_ics_text(desc)}")
+        lines += [
+            f"CATEGORIES:{escape_ics_text(types.get(note_type, ''))}",
+            f"PRIORITY:{ICS_PRIORITIES.get(weight, 0)}",
+            "END:VEVENT",
+        ]
+        if number % ROWS_PER_CHUNK == 0:
+            yield "".join(fold_ics_line(line) for line in lines)
+            lines = []
+    lines.append("END:VCALENDAR")
+    yield "".join(fold_ics_line(line) for line in lines)
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv"),
+    "ndjson": (iter_ndjson, "application/x-ndjson"),
+}
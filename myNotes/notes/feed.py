@@ -0,0 +1,64 @@
+"""Define the iCalendar feed of the user tasks for calendar apps"""
+import secrets
+
+from django.db.models import Count, Max
+
+from uProfile.models import Profile
+from utils.constants import NoteType
+
+from .models import Note
+
+# types of entries published to calendars
+FEED_TYPES = (NoteType.TODO, NoteType.EVENT, NoteType.HOLIDAY)
+
+
+def get_feed_token(profile):
+    """Returns the secret token of the user feed creating it on the first use"""
+    if not profile.feed_token:
+        profile.feed_token = secrets.token_urlsafe(32)
+        profile.save(update_fields=["feed_token"])
+    return profile.feed_token
+
+
+def get_feed_notes(user_id):
+    """Returns entries of the user feed"""
+    return Note.objects.for_user(user_id).filter(type__in=FEED_TYPES)
+
+
+def get_feed_state(request, token):
+    """
+    Returns the owner and the last change of the user entries with the number
+    and the last update of entries of the feed or None if the token is unknown.
+    The state is found by one aggregate query and kept for the request,
+    so the conditional GET does not build the feed.
+    """
+    if not hasattr(request, "_feed_state"):
+        profile = (
+            Profile.objects.filter(feed_token=token)
+            .values("user_id", "notes_changed_at")
+            .first()
+        )
+        request._feed_state = None
+        if profile is not None:
+            request._feed_state = {
+                **profile,
+                **get_feed_notes(profile["user_id"]).aggregate(
+                    count=Count("id"), updated_at=Max("updated_at")
+                ),
+            }
+    return request._feed_state
+
+
+def get_feed_etag(request, token):
+    """Returns the ETag changing with any added, updated or removed entry"""
+    state = get_feed_state(request, token)
+    if state is None:
+        return None
+    updated_at = state["updated_at"].timestamp() if state["updated_at"] else 0
+    return f'"{state["count"]}-{updated_at}"'
+
+
+def get_feed_last_modified(request, token):
+    """Returns the last change of the user entries including removed ones"""
+    state = get_feed_state(request, token)
+    return state and state["notes_changed_at"]
@@ -0,0 +1,51 @@
+"""Define filters of entries by query string parameters"""
+from datetime import date
+
+from utils.constants import NoteType
+
+from .search import search_notes
+
+
+class FilterError(Exception):
+    """Raised when the filter parameter has an invalid value"""
+
+
+def parse_bool(value):
+    """Returns the boolean from the query string value or None if it is not boolean"""
+    return {"true": True, "1": True, "false": False, "0": False}.get(value.lower())
+
+
+def filter_notes(notes, params):
+    """
+    Filter entries like in the pages by the parameters:
+    type ('notes', 'tasks' or the type code), deadline, isComplete and search.
+    Search results are annotated with the rank.
+    """
+    entry_type = params.get("type", "")
+    if entry_type == "notes":
+        notes = notes.journal()
+    elif entry_type == "tasks":
+        notes = notes.tasks()
+    elif entry_type:
+        if entry_type not in map(str, NoteType.values):
+            raise FilterError("Invalid type")
+        notes = notes.filter(type=entry_type)
+
+    deadline = params.get("deadline", "")
+    if deadline:
+        try:
+            notes = notes.day(date.fromisoformat(deadline))
+        except ValueError as err:
+            raise FilterError("Invalid deadline") from err
+
+    is_complete = params.get("isComplete", "")
+    if is_complete:
+        if parse_bool(is_complete) is None:
+            raise FilterError("Invalid isComplete")
+        notes = notes.filter(isComplete=parse_bool(is_complete))
+
+    search_input = params.get("search", "")
+    if search_input:
+        notes = search_notes(notes, search_input)
+
+    return notes
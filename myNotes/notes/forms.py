@@ -1,5 +1,5 @@
 """Define classes for creation app forms"""
-from django.forms import ModelForm, Textarea, TextInput
+from django.forms import ChoiceField, FileField, Form, ModelForm, Textarea, TextInput
 
 from .models import Note
 
@@ -24,3 +24,17 @@ class UpdateNoteForm(ModelForm):
             'desc': Textarea(attrs={'rows': 5}),
             'deadline': TextInput(attrs={'type': "date"}),
         }
+
+
+class ImportNotesForm(Form):
+    """Create form for importing notes from the file"""
+    file = FileField()
+    format = ChoiceField(
+        choices=[
+            ("", "By file extension"),
+            ("csv", "CSV"),
+            ("ndjson", "NDJSON"),
+            ("ics", "iCalendar"),
+        ],
+        required=False,
+    )
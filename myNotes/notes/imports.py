@@ -0,0 +1,261 @@
+"""Define bulk import of entries from CSV, NDJSON and iCalendar files"""
+import codecs
+import csv
+import json
+import os
+import re
+
+from django.core.exceptions import ValidationError
+
+from utils.constants import NoteType, Weight
+
+from .autocomplete import title_prefix_index
+from .conditional import mark_notes_changed
+from .forms import CreateNoteForm, UpdateNoteForm
+from .models import Note
+from .search import update_search_vector
+
+# number of entries created by one INSERT
+IMPORT_BATCH_SIZE = 1000
+
+# max number of invalid rows described in the import report
+MAX_REPORTED_ERRORS = 100
+
+# fields of imported entries validated like in the note forms
+IMPORT_FIELDS = {
+    **CreateNoteForm.base_fields,
+    "isComplete": UpdateNoteForm.base_fields["isComplete"],
+}
+
+# weights and types may be passed by their labels like in the exports
+LABELS = {
+    "weight": {label: value for value, label in Weight.choices},
+    "type": {label: value for value, label in NoteType.choices},
+}
+
+# formats of imported files by extensions
+IMPORT_EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".ics": "ics",
+}
+
+# iCalendar components mapped to the types of entries
+ICS_COMPONENT_TYPES = {
+    "VEVENT": NoteType.EVENT,
+    "VTODO": NoteType.TODO,
+    "VJOURNAL": NoteType.NOTE,
+}
+
+
+class ImportReport:
+    """Numbers of created entries and skipped rows with descriptions of errors"""
+
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    def add_error(self, line_number, message):
+        """Count the skipped row describing the first MAX_REPORTED_ERRORS of them"""
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, message))
+
+
+def read_lines(file):
+    """Yields decoded lines of the binary file without reading it into memory"""
+    return codecs.iterdecode(file, "utf-8-sig", errors="replace")
+
+
+def get_import_format(filename):
+    """Returns the import format by the file extension or None"""
+    extension = os.path.splitext(filename)[1].lower()
+    return IMPORT_EXTENSIONS.get(extension)
+
+
+def iter_csv_rows(lines):
+    """Yields line numbers and rows of the CSV file with the header"""
+    reader = csv.DictReader(lines)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as err:
+            yield reader.line_num, ValidationError(f"Invalid CSV: {err}")
+            continue
+        yield reader.line_num, row
+
+
+def iter_ndjson_rows(lines):
+    """Yields line numbers and rows of the file with a JSON object on each line"""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            row = ValidationError("Invalid JSON object")
+        yield line_number, row
+
+
+def iter_ics_lines(lines):
+    """Yields line numbers and content lines of the iCalendar file unfolding them"""
+    line_number, content_line = 0, None
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if content_line is not None and line[:1] in (" ", "\t"):
+            content_line += line[1:]
+            continue
+        if content_line is not None:
+            yield line_number, content_line
+        line_number, content_line = number, line
+    if content_line is not None:
+        yield line_number, content_line
+
+
+def unescape_ics_text(value):
+    """Returns the text value of the iCalendar property"""
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m[1] in "nN" else m[1], value)
+
+
+def parse_ics_date(value):
+    """Returns the ISO date of the iCalendar date or date-time value"""
+    if re.match(r"\d{8}", value):
+        return f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+    return value
+
+
+def parse_ics_priority(value):
+    """Returns the weight of the iCalendar priority: 1-4 high, 5 normal, 6-9 low"""
+    try:
+        priority = int(value)
+    except ValueError:
+        return value
+    if 1 <= priority <= 4:
+        return Weight.HIGH
+    if 6 <= priority <= 9:
+        return Weight.LOW
+    return Weight.NORMAL
+
+
+def iter_ics_rows(lines):
+    """Yields line numbers and rows of events, to-dos and journal entries of the file"""
+    row = None
+    line_number = 0
+    # depth of components nested into the entry, e.g. alarms
+    nested = 0
+    for number, content_line in iter_ics_lines(lines):
+        name, _, value = content_line.partition(":")
+        name = name.split(";", 1)[0].upper()
+
+        if row is None:
+            if name == "BEGIN" and value.upper() in ICS_COMPONENT_TYPES:
+                row = {"type": ICS_COMPONENT_TYPES[value.upper()]}
+                line_number = number
+        elif name == "BEGIN":
+            nested += 1
+        elif name == "END" and nested:
+            nested -= 1
+        elif name == "END":
+            yield line_number, row
+            row = None
+        elif nested:
+            continue
+        elif name == "SUMMARY":
+            row["title"] = unescape_ics_text(value)
+        elif name == "DESCRIPTION":
+            row["desc"] = unescape_ics_text(value)
+        elif name == "DUE" or (name == "DTSTART" and "deadline" not in row):
+            row["deadline"] = parse_ics_date(value)
+        elif name == "STATUS":
+            row["isComplete"] = value.upper() == "COMPLETED"
+        elif name == "PRIORITY":
+            row["weight"] = parse_ics_priority(value)
+        elif name == "CATEGORIES" and value in LABELS["type"]:
+            # types of entries exported to the calendar feed
+            row["type"] = value
+
+
+IMPORT_FORMATS = {
+    "csv": iter_csv_rows,
+    "ndjson": iter_ndjson_rows,
+    "ics": iter_ics_rows,
+}
+
+
+def clean_row(row):
+    """
+    Returns fields of the entry validated by the fields of the note forms
+    without creating a form for each row. Missing fields get the model defaults.
+    """
+    data = {}
+    errors = []
+    for name, field in IMPORT_FIELDS.items():
+        value = row.get(name)
+        if value is None or value == "":
+            value = Note._meta.get_field(name).get_default()
+        elif name in LABELS and isinstance(value, str):
+            value = LABELS[name].get(value, value)
+
+        try:
+            data[name] = field.clean(value)
+        except ValidationError as err:
+            errors.append(f"{name}: {' '.join(err.messages)}")
+
+    if not data.get("title") and "title" in data:
+        errors.append("title: Title is required field!")
+    if errors:
+        raise ValidationError(errors)
+    return data
+
+
+def import_notes(
+    user, lines, import_format, batch_size=IMPORT_BATCH_SIZE, progress=None
+):
+    """
+    Create entries of the user from the lines of the file with batched INSERTs.
+    Invalid rows are skipped and described in the returned report.
+    The progress callback gets the report after each batch.
+    """
+    report = ImportReport()
+    notes = []
+
+    def create_notes():
+        Note.objects.bulk_create(notes)
+        for note in notes:
+            if note.desc_compressed:
+                # the search trigger does not read compressed descriptions
+                update_search_vector(note)
+        report.created += len(notes)
+        notes.clear()
+        if progress is not None:
+            progress(report)
+
+    for line_number, row in IMPORT_FORMATS[import_format](lines):
+        if isinstance(row, ValidationError):
+            # the row can not be read
+            report.add_error(line_number, row.message)
+            continue
+
+        try:
+            note = Note(user=user, **clean_row(row))
+            # bulk_create does not call save(), which fills the preview
+            note.update_desc_fields()
+            notes.append(note)
+        except ValidationError as err:
+            report.add_error(line_number, " ".join(err.messages))
+
+        if len(notes) >= batch_size:
+            create_notes()
+    create_notes()
+
+    # bulk_create does not send post_save signals
+    title_prefix_index.invalidate(user.pk)
+    if report.created:
+        mark_notes_changed(user.pk)
+    return report
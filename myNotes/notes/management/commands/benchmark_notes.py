@@ -0,0 +1,256 @@
+"""Define command for benchmarking the hot notes queries"""
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from notes.compression import compress_text, decompress_text
+from notes.export import EXPORT_FORMATS
+from notes.models import Note
+from utils.constants import TYPE_CHOICES, WEIGHT_CHOICES
+from utils.utils import get_week_dates
+
+User = get_user_model()
+
+BATCH_SIZE = 10000
+# share of the random notes with descriptions above the compression threshold
+LARGE_DESC_RATE = 0.01
+# words of the random descriptions mixed with numbers,
+# so they compress about as well as real texts rather than repeated phrases
+DESC_WORDS = (
+    "meeting call email report review plan budget project client team task "
+    "deadline draft update notes agenda invoice order delivery doctor dentist "
+    "school homework groceries milk bread coffee train ticket hotel flight "
+    "birthday gift party dinner lunch gym run yoga book movie series garden "
+    "repair car insurance bank payment rent bill password backup server deploy "
+    "bug fix release test design idea question answer summary follow-up"
+).split()
+
+
+def get_random_text(words_count):
+    """Returns text of random words, numbers and sentences"""
+    words = []
+    for position in range(words_count):
+        if random.random() < 0.1:
+            words.append(str(random.randint(0, 10**6)))
+        else:
+            words.append(random.choice(DESC_WORDS))
+        if random.random() < 0.08:
+            words[-1] += random.choice((".", ".", "!", "?", ".\n"))
+        if position == 0 or words[-2][-1] in ".!?\n":
+            words[-1] = words[-1].capitalize()
+    return " ".join(words).replace("\n ", "\n")
+
+
+def seed_notes(user, rows, stdout):
+    """Creates random notes for the user until there are rows of them"""
+    missing = rows - Note.objects.for_user(user).count()
+    types = [value for value, _ in TYPE_CHOICES]
+    weights = [value for value, _ in WEIGHT_CHOICES]
+    today = date.today()
+
+    while missing > 0:
+        batch_size = min(BATCH_SIZE, missing)
+        notes = []
+        for _ in range(batch_size):
+            if random.random() < LARGE_DESC_RATE:
+                desc = get_random_text(random.randint(1500, 15000))
+            else:
+                desc = get_random_text(random.randint(0, 60))
+            note = Note(
+                user=user,
+                title=f"Benchmark note {random.randint(0, 10**9)}",
+                desc=desc,
+                isComplete=random.random() < 0.7,
+                deadline=today + timedelta(days=random.randint(-3650, 365)),
+                weight=random.choice(weights),
+                type=random.choice(types),
+            )
+            # bulk_create does not call save(), which fills the preview
+            note.update_desc_fields()
+            notes.append(note)
+        Note.objects.bulk_create(notes)
+        missing -= batch_size
+        stdout.write(f"{missing} notes left to create", ending="\r")
+    stdout.write("")
+
+
+def get_hot_queries(user):
+    """Returns querysets of the notes views loading rows like the views do"""
+    start_date, _ = get_week_dates()
+    notes = Note.objects.for_user(user)
+    return {
+        "MainView": (
+            notes.tasks()
+            .open()
+            .week(start_date)
+            .order_by("deadline", "-weight", "create_at")
+            .rows()
+        ),
+        "TasksDayListView": (
+            notes.tasks()
+            .day(date.today())
+            .order_by("isComplete", "-weight", "create_at")
+            .rows()
+        ),
+        "TasksAllListView": (
+            notes.tasks().order_by("isComplete", "-weight", "create_at", "id").rows()
+        ),
+        "NoteListView": notes.journal().order_by("-create_at", "-id").rows(),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Show query plans and timings of the hot notes queries.
+    Use --rows to fill the table with random notes of the benchmark user first,
+    e.g. --rows 2000000 to see the plans on a table with millions of rows.
+    Use --export to measure the export of all the notes, e.g. with --rows 1000000.
+    Use --compression to measure zlib on the descriptions above the threshold.
+    """
+
+    help = "Show query plans and timings of the hot notes queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--username",
+            default="benchmark",
+            help="User whose notes are queried (created if missing)",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=0,
+            help="Create random notes of the user until there are that many",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of runs of each query",
+        )
+        parser.add_argument(
+            "--export",
+            action="store_true",
+            help="Measure the streaming export of all notes of the user too",
+        )
+        parser.add_argument(
+            "--compression",
+            action="store_true",
+            help="Measure compression of the large descriptions of the user too",
+        )
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=options["username"])
+        if options["rows"]:
+            seed_notes(user, options["rows"], self.stdout)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE notes_note")
+
+        self.benchmark_queries(user, options["repeat"])
+        if options["export"]:
+            self.benchmark_export(user)
+        if options["compression"]:
+            self.benchmark_compression(user)
+
+    def benchmark_queries(self, user, repeat):
+        """Show plans and timings of the hot queries"""
+        for name, queryset in get_hot_queries(user).items():
+            # measure the plans rather than the transfer of the rows
+            queryset = queryset[:100]
+
+            if connection.vendor == "postgresql":
+                plan = queryset.explain(analyze=True, buffers=True)
+            else:
+                plan = queryset.explain()
+
+            timings = []
+            for _ in range(repeat):
+                started_at = time.perf_counter()
+                list(queryset.all())
+                timings.append(time.perf_counter() - started_at)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            self.stdout.write(
+                self.style.SUCCESS(f"best of {repeat}: {min(timings) * 1000:.2f} ms")
+            )
+
+    def benchmark_export(self, user):
+        """Show throughput and peak memory of the streaming export"""
+        notes = Note.objects.for_user(user)
+        for export_format, (iter_export, _) in EXPORT_FORMATS.items():
+            rows = notes.count()
+
+            started_at = time.perf_counter()
+            size = sum(len(chunk.encode()) for chunk in iter_export(notes)) / 2**20
+            duration = time.perf_counter() - started_at
+
+            # the second run traces memory, which slows it down
+            tracemalloc.start()
+            for _ in iter_export(notes):
+                pass
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Export {export_format}"))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{rows} rows, {size:.1f} MB in {duration:.2f} s: "
+                    f"{rows / duration:.0f} rows/s, {size / duration:.1f} MB/s, "
+                    f"peak memory {peak_memory / 2**20:.1f} MB"
+                )
+            )
+
+    def benchmark_compression(self, user):
+        """Show savings and speed of zlib on the large descriptions"""
+        threshold = settings.NOTES_DESC_COMPRESSION_THRESHOLD
+        raw_size = compressed_size = count = 0
+        compress_time = decompress_time = 0
+        # measure compression as if it was enabled for every large description
+        with override_settings(NOTES_DESC_COMPRESSION=True):
+            for note in (
+                Note.objects.for_user(user).only("desc", "desc_data").iterator()
+            ):
+                data = (note.desc or "").encode()
+                if len(data) < threshold:
+                    continue
+
+                started_at = time.perf_counter()
+                compressed = compress_text(note.desc)
+                compress_time += time.perf_counter() - started_at
+                if compressed is None:
+                    compressed = data
+                else:
+                    started_at = time.perf_counter()
+                    decompress_text(compressed)
+                    decompress_time += time.perf_counter() - started_at
+
+                count += 1
+                raw_size += len(data)
+                compressed_size += len(compressed)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Compression"))
+        if not count:
+            self.stdout.write(f"No descriptions of {threshold} bytes or more")
+            return
+        raw_mb = raw_size / 2**20
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{count} descriptions, {raw_mb:.1f} MB -> "
+                f"{compressed_size / 2**20:.1f} MB, "
+                f"{(1 - compressed_size / raw_size) * 100:.1f}% saved; "
+                f"compress {compress_time / count * 1000:.3f} ms/note "
+                f"({raw_mb / compress_time:.1f} MB/s), "
+                f"decompress {decompress_time / count * 1000:.3f} ms/note "
+                f"({raw_mb / max(decompress_time, 1e-9):.1f} MB/s)"
+            )
+        )
@@ -0,0 +1,29 @@
+"""Define command for showing the hit ratios of the caches"""
+from django.core.management.base import BaseCommand
+
+from notes.content_cache import get_content_cache_stats
+from utils.utils import get_weather_cache_stats
+
+
+class Command(BaseCommand):
+    """
+    Show hits, misses and hit ratios of the rendered entries cache
+    and the weather cache counted since the counters were created.
+    """
+
+    help = "Show hit ratios of the rendered entries and weather caches"
+
+    def handle(self, *args, **options):
+        caches_stats = {
+            "Rendered entries": get_content_cache_stats(),
+            "Weather": get_weather_cache_stats(),
+        }
+        for name, stats in caches_stats.items():
+            # stale hits of the weather cache are hits too
+            requests = sum(stats.values())
+            hits = requests - stats["misses"]
+            ratio = hits / requests * 100 if requests else 0
+            counters = ", ".join(f"{count} {stat}" for stat, count in stats.items())
+            self.stdout.write(
+                self.style.SUCCESS(f"{name}: {counters}, {ratio:.1f}% hit ratio")
+            )
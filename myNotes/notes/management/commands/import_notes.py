@@ -0,0 +1,78 @@
+"""Define command for importing notes from files"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.imports import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    get_import_format,
+    import_notes,
+    read_lines,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Import notes of the user from the CSV, NDJSON or iCalendar file.
+    Invalid rows are skipped and reported, the other rows are imported.
+    """
+
+    help = "Import notes of the user from the CSV, NDJSON or iCalendar file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="Owner of the imported notes")
+        parser.add_argument("path", help="Path to the imported file")
+        parser.add_argument(
+            "--format",
+            choices=list(IMPORT_FORMATS),
+            help="Format of the file (detected by the extension by default)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Number of notes created by one query",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist as err:
+            raise CommandError(f'User "{options["username"]}" not found') from err
+
+        import_format = options["format"] or get_import_format(options["path"])
+        if import_format is None:
+            raise CommandError("Can not detect the format of the file, use --format")
+
+        def show_progress(report):
+            self.stdout.write(
+                f"{report.created} notes created, {report.skipped} rows skipped",
+                ending="\r",
+            )
+
+        started_at = time.monotonic()
+        try:
+            with open(options["path"], "rb") as file:
+                report = import_notes(
+                    user,
+                    read_lines(file),
+                    import_format,
+                    batch_size=options["batch_size"],
+                    progress=show_progress,
+                )
+        except OSError as err:
+            raise CommandError(err) from err
+        self.stdout.write("")
+
+        for line_number, message in report.errors:
+            self.stderr.write(f"Line {line_number}: {message}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report.created} notes created, {report.skipped} rows skipped "
+                f"in {time.monotonic() - started_at:.2f}s"
+            )
+        )
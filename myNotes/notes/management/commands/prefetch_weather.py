@@ -0,0 +1,77 @@
+"""Define command for warming the weather cache"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from uProfile.models import Profile
+from utils.utils import (
+    CityNotFoundError,
+    fetch_weather,
+    normalize_location,
+    store_weather,
+)
+
+
+def get_locations():
+    """Returns distinct profile locations with the default one"""
+    locations = {"kyiv": "Kyiv"}
+    profile_locations = (
+        Profile.objects.exclude(location="")
+        .values_list("location", flat=True)
+        .distinct()
+    )
+    for location in profile_locations.iterator():
+        locations.setdefault(normalize_location(location), location.strip())
+    return list(locations.values())
+
+
+def warm_weather(city):
+    """Gets weather info for the city and stores it to the cache"""
+    try:
+        weather_info = fetch_weather(city)
+    except CityNotFoundError:
+        store_weather(city, None, settings.WEATHER_CACHE_NOT_FOUND_TTL)
+        return "not_found"
+
+    if weather_info is None:
+        return "failed"
+    store_weather(city, weather_info, settings.WEATHER_CACHE_TTL)
+    return "warmed"
+
+
+class Command(BaseCommand):
+    """
+    Warm the weather cache for all profile locations.
+    Run it periodically (e.g. from cron) shortly before the cache expires.
+    Set DJANGO_WEATHER_BASE_URL to run it against a local fake weather server.
+    """
+
+    help = "Warm the weather cache for all distinct profile locations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Number of concurrent requests to the weather service",
+        )
+
+    def handle(self, *args, **options):
+        started_at = time.monotonic()
+        locations = get_locations()
+        results = {"warmed": 0, "not_found": 0, "failed": 0}
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            for result in executor.map(warm_weather, locations):
+                results[result] += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(locations)} locations in {time.monotonic() - started_at:.2f}s: "
+                f"{results['warmed']} warmed, "
+                f"{results['not_found']} not found, "
+                f"{results['failed']} failed"
+            )
+        )
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:23
+
+from django.db import migrations, models
+
+from utils.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # indexes of the large table are built without locking writes
+    atomic = False
+
+    dependencies = [
+        ("notes", "0004_alter_note_type_alter_note_weight"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("type", "Note"), _negated=True),
+                fields=["user", "deadline", "isComplete", "weight", "create_at"],
+                name="note_task_day_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("type", "Note"), _negated=True),
+                fields=["user", "isComplete", "weight", "create_at"],
+                name="note_task_all_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("type", "Note")),
+                fields=["user", "-create_at"],
+                name="note_journal_idx",
+            ),
+        ),
+    ]
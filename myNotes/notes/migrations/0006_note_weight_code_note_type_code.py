@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notes", "0005_note_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="note",
+            name="note_task_day_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="note",
+            name="note_task_all_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="note",
+            name="note_journal_idx",
+        ),
+        migrations.AddField(
+            model_name="note",
+            name="weight_code",
+            field=models.SmallIntegerField(default=2),
+        ),
+        migrations.AddField(
+            model_name="note",
+            name="type_code",
+            field=models.SmallIntegerField(default=2),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:10
+
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+WEIGHTS = {"Low": 1, "Normal": 2, "High": 3}
+TYPES = {"Note": 1, "To do": 2, "Event": 3, "Holiday": 4}
+
+
+def encode(field, codes, default):
+    """Build the expression mapping labels of the field to codes"""
+    return Case(
+        *(When(**{field: label}, then=Value(code)) for label, code in codes.items()),
+        default=Value(default),
+        output_field=models.SmallIntegerField(),
+    )
+
+
+def decode(field, codes, default):
+    """Build the expression mapping codes of the field to labels"""
+    return Case(
+        *(When(**{field: code}, then=Value(label)) for label, code in codes.items()),
+        default=Value(default),
+        output_field=models.CharField(),
+    )
+
+
+def fill_codes(apps, schema_editor):
+    Note = apps.get_model("notes", "Note")
+    Note.objects.update(
+        weight_code=encode("weight", WEIGHTS, WEIGHTS["Normal"]),
+        type_code=encode("type", TYPES, TYPES["To do"]),
+    )
+
+
+def fill_labels(apps, schema_editor):
+    Note = apps.get_model("notes", "Note")
+    Note.objects.update(
+        weight=decode("weight_code", WEIGHTS, "Normal"),
+        type=decode("type_code", TYPES, "To do"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notes", "0006_note_weight_code_note_type_code"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_codes, fill_labels),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+from utils.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # indexes of the large table are built without locking writes,
+    # the fields are swapped by quick catalog changes before that
+    atomic = False
+
+    dependencies = [
+        ("notes", "0007_fill_note_weight_code_type_code"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="note",
+            name="weight",
+        ),
+        migrations.RemoveField(
+            model_name="note",
+            name="type",
+        ),
+        migrations.RenameField(
+            model_name="note",
+            old_name="weight_code",
+            new_name="weight",
+        ),
+        migrations.RenameField(
+            model_name="note",
+            old_name="type_code",
+            new_name="type",
+        ),
+        migrations.AlterField(
+            model_name="note",
+            name="weight",
+            field=models.SmallIntegerField(
+                choices=[(1, "Low"), (2, "Normal"), (3, "High")], default=2
+            ),
+        ),
+        migrations.AlterField(
+            model_name="note",
+            name="type",
+            field=models.SmallIntegerField(
+                choices=[(1, "Note"), (2, "To do"), (3, "Event"), (4, "Holiday")],
+                default=2,
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("type", 1), _negated=True),
+                fields=["user", "deadline", "isComplete", "-weight", "create_at"],
+                name="note_task_day_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("type", 1), _negated=True),
+                fields=["user", "isComplete", "-weight", "create_at"],
+                name="note_task_all_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("type", 1)),
+                fields=["user", "-create_at"],
+                name="note_journal_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:26
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# the search vector is kept up to date by the trigger on every insert
+# and on every update of title or desc, including bulk operations
+CREATE_SEARCH_SQL = """
+CREATE FUNCTION notes_note_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW."desc", '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notes_note_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title, "desc" ON notes_note
+FOR EACH ROW EXECUTE FUNCTION notes_note_search_vector_update();
+
+UPDATE notes_note SET search_vector =
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce("desc", '')), 'B');
+"""
+
+# built without locking writes, so it can not run in the transaction
+CREATE_SEARCH_INDEX_SQL = """
+CREATE INDEX CONCURRENTLY note_search_idx ON notes_note USING gin (search_vector);
+"""
+
+DROP_SEARCH_INDEX_SQL = """
+DROP INDEX CONCURRENTLY IF EXISTS note_search_idx;
+"""
+
+DROP_SEARCH_SQL = """
+DROP TRIGGER IF EXISTS notes_note_search_vector_trigger ON notes_note;
+DROP FUNCTION IF EXISTS notes_note_search_vector_update();
+"""
+
+
+def create_search(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SEARCH_SQL)
+
+
+def drop_search(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SEARCH_SQL)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SEARCH_INDEX_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_SEARCH_INDEX_SQL)
+
+
+class Migration(migrations.Migration):
+    # the index of the large table is built without locking writes
+    atomic = False
+
+    dependencies = [
+        ("notes", "0008_replace_note_weight_type_with_codes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search, drop_search, atomic=True),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
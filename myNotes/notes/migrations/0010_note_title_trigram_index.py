@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:40
+
+from django.db import migrations
+
+CREATE_TRIGRAM_EXTENSION_SQL = "CREATE EXTENSION IF NOT EXISTS pg_trgm;"
+
+# built without locking writes, so it can not run in a transaction
+CREATE_TRIGRAM_INDEX_SQL = """
+CREATE INDEX CONCURRENTLY note_title_trgm_idx
+ON notes_note USING gin (title gin_trgm_ops);
+"""
+
+DROP_TRIGRAM_INDEX_SQL = """
+DROP INDEX CONCURRENTLY IF EXISTS note_title_trgm_idx;
+"""
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_TRIGRAM_EXTENSION_SQL)
+        schema_editor.execute(CREATE_TRIGRAM_INDEX_SQL)
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_TRIGRAM_INDEX_SQL)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("notes", "0009_note_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
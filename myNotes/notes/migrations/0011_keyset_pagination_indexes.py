@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:28
+
+from django.db import migrations, models
+
+from utils.operations import AddIndexConcurrently, RemoveIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # indexes of the large table are built without locking writes
+    atomic = False
+
+    dependencies = [
+        ("notes", "0010_note_title_trigram_index"),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name="note",
+            name="note_task_all_idx",
+        ),
+        RemoveIndexConcurrently(
+            model_name="note",
+            name="note_journal_idx",
+        ),
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("type", 1), _negated=True),
+                fields=["user", "isComplete", "-weight", "create_at", "id"],
+                name="note_task_all_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(
+                condition=models.Q(("type", 1)),
+                fields=["user", "-create_at", "-id"],
+                name="note_journal_idx",
+            ),
+        ),
+    ]
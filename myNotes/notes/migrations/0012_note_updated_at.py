@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:47
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated_at(apps, schema_editor):
+    """Treat existing entries as updated when they were created"""
+    Note = apps.get_model("notes", "Note")
+    Note.objects.update(updated_at=F("create_at"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notes", "0011_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:51
+
+from django.db import migrations, models
+
+from utils.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # indexes of the large table are built without locking writes
+    atomic = False
+
+    dependencies = [
+        ("notes", "0012_note_updated_at"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(fields=["user", "updated_at"], name="note_updated_idx"),
+        ),
+    ]
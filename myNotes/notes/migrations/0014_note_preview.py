@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Length, Substr
+
+PREVIEW_LENGTH = 200
+
+
+def fill_previews(apps, schema_editor):
+    """Copy short descriptions and cut long ones like notes.models.get_preview"""
+    Note = apps.get_model("notes", "Note")
+    notes = Note.objects.exclude(desc=None).annotate(desc_length=Length("desc"))
+    notes.filter(desc_length__lte=PREVIEW_LENGTH).update(preview=F("desc"))
+    notes.filter(desc_length__gt=PREVIEW_LENGTH).update(
+        preview=Concat(Substr("desc", 1, PREVIEW_LENGTH - 1), Value("…"))
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notes", "0013_note_updated_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="preview",
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(fill_previews, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+import notes.compression
+
+# compressed descriptions are indexed by the application (see notes.search),
+# so the trigger keeps their search vectors
+UPDATE_SEARCH_SQL = """
+CREATE OR REPLACE FUNCTION notes_note_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    IF NEW.desc_compressed THEN
+        RETURN NEW;
+    END IF;
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW."desc", '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+RESTORE_SEARCH_SQL = """
+CREATE OR REPLACE FUNCTION notes_note_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW."desc", '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def decompress_descs(apps, schema_editor):
+    """Store compressed descriptions as text again before dropping the columns"""
+    Note = apps.get_model("notes", "Note")
+    rows = Note.objects.filter(desc_compressed=True).values_list("id", "desc_data")
+    for note_id, desc_data in rows.iterator():
+        Note.objects.filter(id=note_id).update(
+            desc=notes.compression.decompress_text(desc_data),
+            desc_compressed=False,
+            desc_data=None,
+        )
+
+
+def update_search(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(UPDATE_SEARCH_SQL)
+
+
+def restore_search(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(RESTORE_SEARCH_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notes", "0014_note_preview"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="desc_compressed",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="note",
+            name="desc_data",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="note",
+            name="desc",
+            field=notes.compression.CompressibleTextField(
+                blank=True,
+                data_field="desc_data",
+                flag_field="desc_compressed",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(migrations.RunPython.noop, decompress_descs),
+        migrations.RunPython(update_search, restore_search),
+    ]
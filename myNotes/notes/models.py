@@ -1,27 +1,201 @@
 """Define app models"""
-from datetime import date
+from datetime import date, timedelta
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.query import ValuesIterable
 
-from utils.constants import TYPE_CHOICES, WEIGHT_CHOICES
+from utils.constants import TYPE_CHOICES, WEIGHT_CHOICES, NoteType, Weight
+from utils.models import DirtyFieldsMixin
+
+from .compression import CompressibleTextField, compress_text
+from .search import update_search_vector
 
 User = get_user_model()
 
+# max length of the beginning of the description shown by the entry lists
+PREVIEW_LENGTH = 200
+
+WEIGHT_LABELS = dict(WEIGHT_CHOICES)
+
+# fields written together with the description
+DESC_FIELDS = ("preview", "desc_compressed", "desc_data")
+
+
+def get_preview(desc):
+    """Returns the beginning of the description shown by the entry lists"""
+    if not desc or len(desc) <= PREVIEW_LENGTH:
+        return desc or ""
+    return desc[: PREVIEW_LENGTH - 1] + "\u2026"
+
+
+class NoteRow:
+    """
+    Read-only row of the entry lists with the fields shown by their templates.
+    The description is not loaded, the lists show its preview.
+    """
+
+    fields = (
+        "id",
+        "title",
+        "preview",
+        "isComplete",
+        "create_at",
+        "deadline",
+        "weight",
+        "type",
+    )
+    # annotations of search results
+    annotations = ("rank", "headline")
+    __slots__ = fields + annotations
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def get_weight_display(self):
+        """Returns the label of the weight like the model method does"""
+        return WEIGHT_LABELS.get(self.weight, self.weight)
+
+
+class NoteRowIterable(ValuesIterable):
+    """Yields rows of values() querysets as NoteRow objects"""
+
+    def __iter__(self):
+        for values in super().__iter__():
+            yield NoteRow(**values)
+
+
+class NoteQuerySet(models.QuerySet):
+    """
+    Composable filters of entries. Views build their queries from them,
+    so each view has one shape of SQL matching the conditions of the indexes.
+    """
 
-class Note(models.Model):
+    def for_user(self, user):
+        """Returns entries of the user (the first column of all indexes)"""
+        return self.filter(user=user)
+
+    def tasks(self):
+        """Returns entries excluding the type 'note' like the task indexes"""
+        return self.exclude(type=NoteType.NOTE)
+
+    def journal(self):
+        """Returns entries with the type 'note' like the journal index"""
+        return self.filter(type=NoteType.NOTE)
+
+    def open(self):
+        """Returns uncompleted entries"""
+        return self.filter(isComplete=False)
+
+    def day(self, deadline):
+        """Returns entries with the deadline on the day"""
+        return self.filter(deadline=deadline)
+
+    def between(self, start_date, end_date):
+        """Returns entries with deadlines from start_date to end_date inclusive"""
+        return self.filter(deadline__range=(start_date, end_date))
+
+    def week(self, start_date):
+        """Returns entries with deadlines in the week starting on start_date"""
+        return self.between(start_date, start_date + timedelta(days=6))
+
+    def rows(self):
+        """
+        Returns entries as NoteRow objects loading only the fields of the lists.
+        Call it after filters and annotations of the search.
+        """
+        annotations = [
+            name for name in NoteRow.annotations if name in self.query.annotations
+        ]
+        queryset = self.values(*NoteRow.fields, *annotations)
+        queryset._iterable_class = NoteRowIterable
+        return queryset
+
+
+class Note(DirtyFieldsMixin, models.Model):
     """Model of db entries about note"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     title = models.CharField(max_length=200, null=True, blank=True)
-    desc = models.TextField(null=True, blank=True)
+    # NULL when the description is stored compressed in desc_data
+    desc = CompressibleTextField(
+        null=True, blank=True, flag_field="desc_compressed", data_field="desc_data"
+    )
     isComplete = models.BooleanField(default=False)
     create_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     deadline = models.DateField(default=date.today)
-    weight = models.CharField(max_length=20, choices=WEIGHT_CHOICES, default="Normal")
-    type = models.CharField(max_length=20, choices=TYPE_CHOICES, default="To do")
+    weight = models.SmallIntegerField(choices=WEIGHT_CHOICES, default=Weight.NORMAL)
+    type = models.SmallIntegerField(choices=TYPE_CHOICES, default=NoteType.TODO)
+    # filled by the database trigger on PostgreSQL (see notes.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # beginning of the description shown by the lists instead of it
+    preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True, editable=False)
+    # large descriptions are compressed if NOTES_DESC_COMPRESSION is on
+    desc_compressed = models.BooleanField(default=False, editable=False)
+    desc_data = models.BinaryField(null=True, editable=False)
+
+    objects = NoteQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # the compressed description is decompressed on the first access
+        if instance.__dict__.get("desc_compressed"):
+            instance.__dict__.pop("desc", None)
+        return instance
+
+    def update_desc_fields(self):
+        """Fill the preview and compress the description if it is large"""
+        self.preview = get_preview(self.desc)
+        self.desc_data = compress_text(self.desc)
+        self.desc_compressed = self.desc_data is not None
+
+    def save(self, *args, **kwargs):
+        # compressed descriptions which were not read are kept as they are
+        if "desc" in self.__dict__:
+            self.update_desc_fields()
+            # the text moves between the columns when the compression settings
+            # change, so it is written even if it was only read (see DirtyFieldsMixin)
+            if {"desc_compressed", "desc_data"} & set(self.get_dirty_fields()):
+                getattr(self, "_loaded_values", {}).pop("desc", None)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "desc" in update_fields:
+            kwargs["update_fields"] = {*update_fields, *DESC_FIELDS}
+
+        # the search trigger does not read compressed descriptions
+        index_desc = self.desc_compressed and (
+            self._state.adding or {"title", "desc"} & set(self.get_dirty_fields())
+        )
+        super().save(*args, **kwargs)
+        if index_desc:
+            update_search_vector(self)
+
     class Meta:
         ordering = ["isComplete"]
+        indexes = [
+            # tasks of the week (MainView) and of the day (TasksDayListView)
+            models.Index(
+                fields=["user", "deadline", "isComplete", "-weight", "create_at"],
+                condition=~models.Q(type=NoteType.NOTE),
+                name="note_task_day_idx",
+            ),
+            # all tasks (TasksAllListView)
+            models.Index(
+                fields=["user", "isComplete", "-weight", "create_at", "id"],
+                condition=~models.Q(type=NoteType.NOTE),
+                name="note_task_all_idx",
+            ),
+            # journal (NoteListView)
+            models.Index(
+                fields=["user", "-create_at", "-id"],
+                condition=models.Q(type=NoteType.NOTE),
+                name="note_journal_idx",
+            ),
+            # entries changed since the time (e.g. the calendar feed)
+            models.Index(fields=["user", "updated_at"], name="note_updated_idx"),
+        ]
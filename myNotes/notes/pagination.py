@@ -0,0 +1,117 @@
+"""Define keyset (cursor) pagination of entries"""
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+class InvalidCursor(Exception):
+    """Raised when the cursor can not be decoded"""
+
+
+def encode_cursor(values):
+    """Encodes values of the ordering fields of the last row"""
+    # dates are encoded by isoformat keeping microseconds for exact comparison
+    data = json.dumps(
+        values, default=lambda value: value.isoformat(), separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def get_ordering_field(queryset, field_name):
+    """Returns the model field or the output field of the annotation"""
+    name = field_name.lstrip("-")
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    return queryset.model._meta.get_field(name)
+
+
+def decode_cursor(cursor, queryset, ordering):
+    """Decodes values of the ordering fields (or annotations) from the cursor"""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError) as err:
+        raise InvalidCursor(cursor) from err
+
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor(cursor)
+
+    decoded_values = []
+    for field_name, value in zip(ordering, values):
+        try:
+            value = get_ordering_field(queryset, field_name).to_python(value)
+        except (FieldDoesNotExist, ValidationError, TypeError) as err:
+            # date fields raise TypeError for JSON numbers, lists and objects
+            raise InvalidCursor(cursor) from err
+        # fields of the ordering are not null
+        if value is None:
+            raise InvalidCursor(cursor)
+        decoded_values.append(value)
+    return decoded_values
+
+
+def get_after_filter(ordering, values):
+    """
+    Build the filter of rows going after the row with the values in the ordering:
+    (a > x) or (a = x and b > y) or (a = x and b = y and c > z) ...
+    """
+    after_filter = Q()
+    equal_filter = Q()
+    for field_name, value in zip(ordering, values):
+        name = field_name.lstrip("-")
+        lookup = "lt" if field_name.startswith("-") else "gt"
+        after_filter |= equal_filter & Q(**{f"{name}__{lookup}": value})
+        equal_filter &= Q(**{name: value})
+    return after_filter
+
+
+def paginate_by_keyset(queryset, ordering, cursor, page_size):
+    """
+    Returns the page of rows going after the cursor and the cursor of the next page.
+    The ordering has to end with a unique field and contain non-null fields only,
+    so the cost of any page does not depend on its number unlike OFFSET.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, queryset, ordering)
+        queryset = queryset.filter(get_after_filter(ordering, values))
+
+    rows = list(queryset[: page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    last_row = rows[-1]
+    if isinstance(last_row, dict):
+        # rows of values() querysets are dicts
+        values = [last_row[field_name.lstrip("-")] for field_name in ordering]
+    else:
+        values = [getattr(last_row, field_name.lstrip("-")) for field_name in ordering]
+    next_cursor = encode_cursor(values)
+    return rows, next_cursor
+
+
+class KeysetPaginationMixin:
+    """Paginate entries of the list view by the cursor from the query string"""
+
+    page_size = settings.NOTES_PAGE_SIZE
+
+    def paginate_by_keyset(self, queryset, ordering):
+        """Returns the page of rows and the query string of the next page"""
+        try:
+            rows, next_cursor = paginate_by_keyset(
+                queryset, ordering, self.request.GET.get("cursor", ""), self.page_size
+            )
+        except InvalidCursor as err:
+            raise Http404("Invalid page cursor") from err
+
+        next_page_query = None
+        if next_cursor:
+            query = self.request.GET.copy()
+            query["cursor"] = next_cursor
+            next_page_query = query.urlencode()
+        return rows, next_page_query
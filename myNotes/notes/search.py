@@ -0,0 +1,86 @@
+"""Define full-text search over notes"""
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connections
+from django.db.models import CharField, F, FloatField, Q, Value
+from django.db.models.functions import Cast
+
+from .compression import decompress_text
+
+# text search configuration used by the search_vector trigger (see migrations)
+SEARCH_CONFIG = "english"
+
+# markers of the matched words in headlines replaced by the highlight filter
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+
+
+def is_postgresql(queryset):
+    """Check if the queryset runs on PostgreSQL keeping search vectors and trigram indexes"""
+    return connections[queryset.db].vendor == "postgresql"
+
+
+def get_compressed_matches(queryset, search_input):
+    """
+    Returns ids of the entries with compressed descriptions containing the input.
+    The descriptions are decompressed in Python, which only the fallback does.
+    """
+    folded_input = search_input.casefold()
+    rows = queryset.filter(desc_compressed=True).values_list("id", "desc_data")
+    return [
+        note_id
+        for note_id, desc_data in rows.iterator()
+        if folded_input in decompress_text(desc_data).casefold()
+    ]
+
+
+def search_notes(queryset, search_input):
+    """
+    Filter entries by the search query over title and description
+    annotating them with the search rank and the highlighted description headline.
+    """
+    if not is_postgresql(queryset):
+        # fallback for databases without full-text search (e.g. SQLite)
+        return queryset.filter(
+            Q(title__icontains=search_input)
+            | Q(desc__icontains=search_input)
+            | Q(pk__in=get_compressed_matches(queryset, search_input))
+        ).annotate(
+            rank=Value(0.0, output_field=FloatField()),
+            headline=Value(None, output_field=CharField()),
+        )
+
+    query = SearchQuery(search_input, config=SEARCH_CONFIG, search_type="websearch")
+    return queryset.filter(search_vector=query).annotate(
+        # double precision keeps the rank exact in pagination cursors
+        rank=Cast(SearchRank(F("search_vector"), query), FloatField()),
+        headline=SearchHeadline(
+            "desc",
+            query,
+            config=SEARCH_CONFIG,
+            start_sel=HIGHLIGHT_START,
+            stop_sel=HIGHLIGHT_STOP,
+            max_words=35,
+            min_words=15,
+        ),
+    )
+
+
+def update_search_vector(note):
+    """
+    Index the title and the description of the entry by the application.
+    The trigger skips compressed descriptions, which it can not read.
+    """
+    queryset = type(note).objects.filter(pk=note.pk)
+    if not is_postgresql(queryset):
+        return
+    queryset.update(
+        search_vector=SearchVector(
+            Value(note.title or ""), weight="A", config=SEARCH_CONFIG
+        )
+        + SearchVector(Value(note.desc or ""), weight="B", config=SEARCH_CONFIG)
+    )
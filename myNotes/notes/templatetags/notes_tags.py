@@ -0,0 +1,16 @@
+"""Define template filters for notes pages"""
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from notes.search import HIGHLIGHT_START, HIGHLIGHT_STOP
+
+register = template.Library()
+
+
+@register.filter
+def highlight(headline):
+    """Escape the search headline and mark the matched words"""
+    html = escape(headline)
+    html = html.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+    return mark_safe(html)
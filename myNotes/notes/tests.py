@@ -1,12 +1,56 @@
 """Tests for notes app"""
 
-from datetime import date, datetime, timedelta
-from time import sleep
-
+import asyncio
+import csv
+import io
+import json
+import threading
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from time import monotonic, sleep
+from unittest import skipIf, skipUnless
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from asgiref.sync import async_to_sync, sync_to_async
 from django.contrib.auth.models import User
-from django.test import TestCase
-
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.forms.models import model_to_dict
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import include, path
+
+from uProfile.models import Profile
+from utils.async_weather import get_session, get_weather_async
+from utils.constants import NoteType, Weight
+from utils.utils import (
+    CircuitBreaker,
+    CityNotFoundError,
+    fetch_weather,
+    get_weather,
+    get_weather_cache,
+    get_weather_cache_key,
+    get_weather_cache_stats,
+    get_week_dates,
+    store_weather,
+    weather_breaker,
+)
+
+from .api import dump_json
+from .autocomplete import TitlePrefixIndex, get_title_suggestions
+from .batch import apply_batch_operation
+from .conditional import mark_notes_changed
+from .content_cache import get_content_cache_stats
+from .feed import get_feed_token
+from .forms import UpdateNoteForm
 from .models import Note
+from .pagination import encode_cursor
+from .search import HIGHLIGHT_START, HIGHLIGHT_STOP, search_notes
+from .templatetags.notes_tags import highlight
+from .views import AsyncMainView, NoteListView, TasksAllListView
 
 
 def create_test_user(username="test_user", password="password"):
@@ -16,9 +60,9 @@ def create_test_user(username="test_user", password="password"):
 
 def create_test_note(
     title="Test note",
-    note_type="To do",
+    note_type=NoteType.TODO,
     deadline=date.today().strftime("%Y-%m-%d"),
-    weight="Normal",
+    weight=Weight.NORMAL,
     is_complete=False,
     user=None,
 ):
@@ -44,11 +88,11 @@ class NoteModelTest(TestCase):
         all_notes = Note.objects.all()
         self.assertEqual(len(all_notes), 1)
 
-        self.assertEqual(note.type, "To do")
+        self.assertEqual(note.type, NoteType.TODO)
         self.assertEqual(note.title, "Test note")
         self.assertEqual(note.desc, "Test text")
         self.assertEqual(note.isComplete, False)
-        self.assertEqual(note.weight, "Normal")
+        self.assertEqual(note.weight, Weight.NORMAL)
         self.assertEqual(note.deadline, date.today().strftime("%Y-%m-%d"))
 
 
@@ -87,10 +131,10 @@ class NoteCreateViewTestCase(TestCase):
         new_note = {
             "title": "New title",
             "desc": "Test text",
-            "type": "Note",
+            "type": NoteType.NOTE,
             "isComplete": False,
             "deadline": "2023-12-14",
-            "weight": "Normal",
+            "weight": Weight.NORMAL,
         }
         self.client.post("/notes/note-create/", data=new_note)
 
@@ -100,10 +144,10 @@ class NoteCreateViewTestCase(TestCase):
         self.assertEqual(note.user.username, "test_user")
         self.assertEqual(note.title, "New title")
         self.assertEqual(note.desc, "Test text")
-        self.assertEqual(note.type, "Note")
+        self.assertEqual(note.type, NoteType.NOTE)
         self.assertEqual(note.isComplete, False)
         self.assertEqual(note.deadline, date(2023, 12, 14))
-        self.assertEqual(note.weight, "Normal")
+        self.assertEqual(note.weight, Weight.NORMAL)
 
     def test_redirect_after_creation_note(self):
         """
@@ -114,10 +158,10 @@ class NoteCreateViewTestCase(TestCase):
         new_note = {
             "title": "New title",
             "desc": "Test text",
-            "type": "Note",
+            "type": NoteType.NOTE,
             "isComplete": False,
             "deadline": "2023-12-14",
-            "weight": "Normal",
+            "weight": Weight.NORMAL,
         }
         resp = self.client.post("/notes/note-create/?next=/notes/main/", data=new_note)
         self.assertEqual(resp.status_code, 302)
@@ -177,10 +221,10 @@ class NoteUpdateViewTestCase(TestCase):
         new_data = {
             "title": "New title",
             "desc": "Test text",
-            "type": "Note",
+            "type": NoteType.NOTE,
             "isComplete": True,
             "deadline": date.today().strftime("%Y-%m-%d"),
-            "weight": "Normal",
+            "weight": Weight.NORMAL,
         }
         self.client.post(f"/notes/note-update/{note.id}/", data=new_data)
 
@@ -189,10 +233,10 @@ class NoteUpdateViewTestCase(TestCase):
         self.assertEqual(note.user.username, "test_user")
         self.assertEqual(note.title, "New title")
         self.assertEqual(note.desc, "Test text")
-        self.assertEqual(note.type, "Note")
+        self.assertEqual(note.type, NoteType.NOTE)
         self.assertEqual(note.isComplete, True)
         self.assertEqual(note.deadline, date.today())
-        self.assertEqual(note.weight, "Normal")
+        self.assertEqual(note.weight, Weight.NORMAL)
 
     def test_redirect_after_creation_note(self):
         """
@@ -203,10 +247,10 @@ class NoteUpdateViewTestCase(TestCase):
         new_data = {
             "title": "New title",
             "desc": "Test text",
-            "type": "Note",
+            "type": NoteType.NOTE,
             "isComplete": True,
             "deadline": date.today().strftime("%Y-%m-%d"),
-            "weight": "Normal",
+            "weight": Weight.NORMAL,
         }
         resp = self.client.post(
             f"/notes/note-update/{note.id}/?next=/notes/main/", data=new_data
@@ -392,7 +436,7 @@ class NoteDetailsViewTestCase(TestCase):
         html = response.content.decode("utf8")
         self.assertIn(note.title, html)
         self.assertIn(note.desc, html)
-        self.assertIn(note.weight, html)
+        self.assertIn(note.get_weight_display(), html)
 
     def test_go_back_button_redirect_url(self):
         """
@@ -441,9 +485,9 @@ class NotesListViewTestCase(TestCase):
         """Tests that NoteListView show entries with type 'Note' only"""
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
-        create_test_note(note_type="Note", title="Note Title", user=test_user)
-        create_test_note(note_type="To do", title="To do Title", user=test_user)
-        create_test_note(note_type="Event", title="Event Title", user=test_user)
+        create_test_note(note_type=NoteType.NOTE, title="Note Title", user=test_user)
+        create_test_note(note_type=NoteType.TODO, title="To do Title", user=test_user)
+        create_test_note(note_type=NoteType.EVENT, title="Event Title", user=test_user)
         resp = self.client.get("/notes/")
         self.assertEqual(resp.status_code, 200)
 
@@ -457,14 +501,18 @@ class NotesListViewTestCase(TestCase):
         test_user_1 = create_test_user()
         test_user_2 = create_test_user(username="test_user_2", password="password_2")
         self.client.login(username="test_user", password="password")
-        create_test_note(note_type="Note", title="User 1 Title", user=test_user_1)
         create_test_note(
-            note_type="Note", title="User 1 Another Title", user=test_user_1
+            note_type=NoteType.NOTE, title="User 1 Title", user=test_user_1
+        )
+        create_test_note(
+            note_type=NoteType.NOTE, title="User 1 Another Title", user=test_user_1
         )
         self.client.logout()
 
         self.client.login(username="test_user_2", password="password_2")
-        create_test_note(note_type="Note", title="User 2 Title", user=test_user_2)
+        create_test_note(
+            note_type=NoteType.NOTE, title="User 2 Title", user=test_user_2
+        )
         resp = self.client.get("/notes/")
         self.assertEqual(resp.status_code, 200)
 
@@ -477,11 +525,11 @@ class NotesListViewTestCase(TestCase):
         """Test that entries ordered by creation date correctly"""
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
-        create_test_note(note_type="Note", title="Note Title", user=test_user)
+        create_test_note(note_type=NoteType.NOTE, title="Note Title", user=test_user)
         sleep(0.5)
-        create_test_note(note_type="Note", title="To do Title", user=test_user)
+        create_test_note(note_type=NoteType.NOTE, title="To do Title", user=test_user)
         sleep(0.5)
-        create_test_note(note_type="Note", title="Event Title", user=test_user)
+        create_test_note(note_type=NoteType.NOTE, title="Event Title", user=test_user)
         resp = self.client.get("/notes/")
         self.assertEqual(resp.status_code, 200)
 
@@ -500,9 +548,9 @@ class NotesListViewTestCase(TestCase):
         """Test that search by title returns correct data"""
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
-        create_test_note(note_type="Note", title="Note Title", user=test_user)
-        create_test_note(note_type="Note", title="Another Title", user=test_user)
-        create_test_note(note_type="Note", title="Third Title", user=test_user)
+        create_test_note(note_type=NoteType.NOTE, title="Note Title", user=test_user)
+        create_test_note(note_type=NoteType.NOTE, title="Another Title", user=test_user)
+        create_test_note(note_type=NoteType.NOTE, title="Third Title", user=test_user)
         resp = self.client.get("/notes/?search-area=o")
         self.assertEqual(resp.status_code, 200)
 
@@ -542,16 +590,19 @@ class TasksDayListViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="Note", title="Note Title", deadline="2023-12-14", user=test_user
+            note_type=NoteType.NOTE,
+            title="Note Title",
+            deadline="2023-12-14",
+            user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do Title",
             deadline="2023-12-14",
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event Title",
             deadline="2023-12-14",
             user=test_user,
@@ -570,7 +621,7 @@ class TasksDayListViewTestCase(TestCase):
         test_user_2 = create_test_user(username="test_user_2", password="password_2")
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="User 1 Title",
             deadline="2023-12-14",
             user=test_user_1,
@@ -579,13 +630,13 @@ class TasksDayListViewTestCase(TestCase):
 
         self.client.login(username="test_user_2", password="password_2")
         create_test_note(
-            note_type="Note",
+            note_type=NoteType.NOTE,
             title="User 2 Another Title",
             deadline="2023-12-14",
             user=test_user_2,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="User 2 Title",
             deadline="2023-12-14",
             user=test_user_2,
@@ -603,19 +654,19 @@ class TasksDayListViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do 1 Title",
             deadline="2023-11-11",
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do 2 Title",
             deadline="2023-12-14",
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event Title",
             deadline="2023-12-14",
             user=test_user,
@@ -636,24 +687,24 @@ class TasksDayListViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="Note Title",
-            weight="High",
+            weight=Weight.HIGH,
             is_complete=True,
             deadline="2023-12-14",
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do Title",
-            weight="Low",
+            weight=Weight.LOW,
             deadline="2023-12-14",
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event Title",
-            weight="High",
+            weight=Weight.HIGH,
             deadline="2023-12-14",
             user=test_user,
         )
@@ -669,16 +720,19 @@ class TasksDayListViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do", title="Note Title", deadline="2023-12-14", user=test_user
+            note_type=NoteType.TODO,
+            title="Note Title",
+            deadline="2023-12-14",
+            user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Another Title",
             deadline="2023-12-14",
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="Third Title",
             deadline="2023-12-14",
             user=test_user,
@@ -722,16 +776,19 @@ class TasksAllListViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="Note", title="Note Title", deadline="2022-12-14", user=test_user
+            note_type=NoteType.NOTE,
+            title="Note Title",
+            deadline="2022-12-14",
+            user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do Title",
             deadline="2023-10-10",
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event Title",
             deadline="2018-12-18",
             user=test_user,
@@ -750,7 +807,7 @@ class TasksAllListViewTestCase(TestCase):
         test_user_2 = create_test_user(username="test_user_2", password="password_2")
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="User 1 Title",
             deadline="2023-11-14",
             user=test_user_1,
@@ -759,13 +816,13 @@ class TasksAllListViewTestCase(TestCase):
 
         self.client.login(username="test_user_2", password="password_2")
         create_test_note(
-            note_type="Note",
+            note_type=NoteType.NOTE,
             title="User 2 Another Title",
             deadline="2022-10-14",
             user=test_user_2,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="User 2 Title",
             deadline="2023-05-10",
             user=test_user_2,
@@ -783,18 +840,18 @@ class TasksAllListViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do 1 Title",
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do 2 Title",
             deadline="2023-12-10",
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event Title",
             deadline="2022-12-12",
             user=test_user,
@@ -815,31 +872,31 @@ class TasksAllListViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do 1 Title",
-            weight="High",
+            weight=Weight.HIGH,
             is_complete=True,
             deadline="2023-12-14",
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do 2 Title",
-            weight="High",
+            weight=Weight.HIGH,
             deadline="2023-12-14",
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do Title",
-            weight="Low",
+            weight=Weight.LOW,
             deadline="2023-12-14",
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event Title",
-            weight="High",
+            weight=Weight.HIGH,
             deadline="2022-12-14",
             user=test_user,
         )
@@ -856,16 +913,19 @@ class TasksAllListViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do", title="Note Title", deadline="2023-10-10", user=test_user
+            note_type=NoteType.TODO,
+            title="Note Title",
+            deadline="2023-10-10",
+            user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Another Title",
             deadline="2023-12-14",
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="Third Title",
             deadline="2022-11-11",
             user=test_user,
@@ -909,19 +969,19 @@ class MainViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="Note",
+            note_type=NoteType.NOTE,
             title="Note Title",
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do Title",
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event Title",
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
@@ -939,20 +999,20 @@ class MainViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do 1 Title",
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do 2 Title",
             is_complete=True,
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event Title",
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
@@ -971,7 +1031,7 @@ class MainViewTestCase(TestCase):
         test_user_2 = create_test_user(username="test_user_2", password="password_2")
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="User 1 Title",
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user_1,
@@ -980,13 +1040,13 @@ class MainViewTestCase(TestCase):
 
         self.client.login(username="test_user_2", password="password_2")
         create_test_note(
-            note_type="Note",
+            note_type=NoteType.NOTE,
             title="User 2 Another Title",
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user_2,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="User 2 Title",
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user_2,
@@ -1004,25 +1064,25 @@ class MainViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do 1 Title",
             deadline=(datetime.today() + timedelta(days=-7)).strftime("%Y-%m-%d"),
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do 2 Title",
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event 1 Title",
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event 2 Title",
             deadline=(datetime.today() + timedelta(days=7)).strftime("%Y-%m-%d"),
             user=test_user,
@@ -1044,23 +1104,23 @@ class MainViewTestCase(TestCase):
         test_user = create_test_user()
         self.client.login(username="test_user", password="password")
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="Note Title",
-            weight="High",
+            weight=Weight.HIGH,
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
         )
         create_test_note(
-            note_type="To do",
+            note_type=NoteType.TODO,
             title="To do Title",
-            weight="Normal",
+            weight=Weight.NORMAL,
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
         )
         create_test_note(
-            note_type="Event",
+            note_type=NoteType.EVENT,
             title="Event Title",
-            weight="High",
+            weight=Weight.HIGH,
             deadline=datetime.today().strftime("%Y-%m-%d"),
             user=test_user,
         )
@@ -1070,3 +1130,1663 @@ class MainViewTestCase(TestCase):
         html = resp.content.decode("utf8")
         self.assertTrue(html.find("Note Title") < (html.find("Event Title")))
         self.assertTrue(html.find("Event Title") < (html.find("To do Title")))
+
+
+class WeatherWidgetTestCase(TestCase):
+    """Tests weather_widget"""
+
+    weather_info = {
+        "location": "Kyiv, UA",
+        "temp": 5,
+        "icon": "01d",
+        "feels_like": 3,
+        "description": "clear sky",
+        "wind": {"speed": 2, "gust": "-"},
+    }
+
+    def setUp(self):
+        get_weather_cache().clear()
+
+    def test_redirect_if_not_logged_in(self):
+        """Test that not authorized user will be redirected to login page"""
+        resp = self.client.get("/notes/weather/")
+        self.assertEqual(resp.status_code, 302)
+        self.assertTrue(resp.url.startswith("/auth/login/"))
+
+    def test_weather_widget_shows_cached_weather(self):
+        """Test that the widget shows weather info for the user location"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+        store_weather("Kyiv", self.weather_info, 600)
+
+        resp = self.client.get("/notes/weather/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, "notes/templates/notes/weather_widget.html")
+        self.assertIn("Kyiv, UA", resp.content.decode("utf8"))
+
+    def test_weather_widget_returns_json(self):
+        """Test that the widget returns weather info as JSON on request"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+        store_weather("Kyiv", self.weather_info, 600)
+
+        resp = self.client.get("/notes/weather/?format=json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json(), {"weather": self.weather_info})
+
+
+class AutocompleteTitlesTestCase(TestCase):
+    """Tests autocomplete_titles"""
+
+    def test_redirect_if_not_logged_in(self):
+        """Test that not authorized user will be redirected to login page"""
+        resp = self.client.get("/notes/autocomplete/?q=t")
+        self.assertEqual(resp.status_code, 302)
+        self.assertTrue(resp.url.startswith("/auth/login/"))
+
+    def test_autocomplete_suggests_titles_by_word_prefix(self):
+        """Test that titles having a word starting with the query are suggested"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        create_test_note(title="Buy milk", user=test_user)
+        create_test_note(title="Call mom", user=test_user)
+        create_test_note(title="Visit dentist", user=test_user)
+
+        resp = self.client.get("/notes/autocomplete/?q=M")
+        self.assertEqual(resp.status_code, 200)
+
+        titles = [result["title"] for result in resp.json()["results"]]
+        self.assertCountEqual(titles, ["Buy milk", "Call mom"])
+
+    def test_autocomplete_suggests_only_user_entries_of_scope(self):
+        """Test that only user's entries of the requested scope are suggested"""
+        test_user_1 = create_test_user()
+        test_user_2 = create_test_user(username="test_user_2", password="password_2")
+        create_test_note(title="Task title", user=test_user_1)
+        create_test_note(note_type=NoteType.NOTE, title="Note title", user=test_user_1)
+        create_test_note(title="Tea time", user=test_user_2)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.get("/notes/autocomplete/?q=t")
+        titles = [result["title"] for result in resp.json()["results"]]
+        self.assertEqual(titles, ["Task title"])
+
+        resp = self.client.get("/notes/autocomplete/?q=t&scope=notes")
+        titles = [result["title"] for result in resp.json()["results"]]
+        self.assertEqual(titles, ["Note title"])
+
+    def test_autocomplete_suggests_new_titles(self):
+        """Test that suggestions are updated when entries are changed"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        note = create_test_note(title="Old title", user=test_user)
+        resp = self.client.get("/notes/autocomplete/?q=new")
+        self.assertEqual(resp.json()["results"], [])
+
+        note.title = "New title"
+        note.save()
+        resp = self.client.get("/notes/autocomplete/?q=new")
+        self.assertEqual(
+            resp.json()["results"], [{"id": note.id, "title": "New title"}]
+        )
+
+    def test_autocomplete_does_not_suggest_titles_by_substring(self):
+        """Test that the query inside a word does not match like on PostgreSQL"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        create_test_note(title="Buy milk", user=test_user)
+
+        resp = self.client.get("/notes/autocomplete/?q=ilk")
+        self.assertEqual(resp.json()["results"], [])
+
+    def test_prefix_index_drops_least_recently_used_titles(self):
+        """Test that the in-memory index keeps titles of max_size users"""
+        users = [create_test_user(username=f"user_{i}") for i in range(3)]
+        for user in users:
+            create_test_note(title=f"Title of {user.username}", user=user)
+        index = TitlePrefixIndex(max_size=2)
+
+        def search(user):
+            queryset = Note.objects.for_user(user)
+            return index.search((user.pk, "tasks"), queryset, "title", limit=10)
+
+        search(users[0])
+        search(users[1])
+        search(users[0])
+        search(users[2])
+        self.assertEqual(
+            list(index._entries), [(users[0].pk, "tasks"), (users[2].pk, "tasks")]
+        )
+        self.assertEqual([title for _, title in search(users[1])], ["Title of user_1"])
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Tests pagination of NoteListView and TasksAllListView"""
+
+    def get_all_pages(self, url, context_name):
+        """Returns titles of entries of all pages following the next page links"""
+        titles = []
+        query = ""
+        while query is not None:
+            resp = self.client.get(f"{url}?{query}")
+            self.assertEqual(resp.status_code, 200)
+            titles.extend(note.title for note in resp.context_data[context_name])
+            query = resp.context_data["next_page_query"]
+        return titles
+
+    def test_note_list_pages_show_each_entry_once(self):
+        """Tests that pages of NoteListView show all entries in order without repeats"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        for number in range(5):
+            create_test_note(
+                note_type=NoteType.NOTE, title=f"Note {number}", user=test_user
+            )
+
+        with patch.object(NoteListView, "page_size", 2):
+            titles = self.get_all_pages("/notes/", "notes")
+        self.assertEqual(titles, [f"Note {number}" for number in range(4, -1, -1)])
+
+    def test_tasks_list_pages_show_each_entry_once(self):
+        """Tests that pages of TasksAllListView show all entries without repeats"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        for number in range(5):
+            create_test_note(
+                title=f"To do {number}", weight=Weight.HIGH, user=test_user
+            )
+
+        with patch.object(TasksAllListView, "page_size", 2):
+            titles = self.get_all_pages("/notes/all/", "tasks")
+        self.assertEqual(titles, [f"To do {number}" for number in range(5)])
+
+    def test_invalid_cursor_returns_404(self):
+        """Tests that the page with the broken cursor is not found"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+        resp = self.client.get("/notes/?cursor=broken")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_cursor_with_invalid_values_is_rejected(self):
+        """Tests that values of the wrong types in the cursor are not queried"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+        cursors = [
+            # the search rank, the creation time and the id
+            encode_cursor(["x", "2020-01-01", 1]),
+            encode_cursor([None, "2020-01-01", 1]),
+            encode_cursor([1.0, 20200101, 1]),
+            encode_cursor([1.0, "2020-01-01", [1]]),
+        ]
+        for cursor in cursors:
+            resp = self.client.get(f"/notes/?search-area=a&cursor={cursor}")
+            self.assertEqual(resp.status_code, 404)
+            resp = self.client.get(f"/api/v1/notes/?search=a&cursor={cursor}")
+            self.assertEqual(resp.status_code, 400)
+
+        # the cursor of the search page is accepted
+        cursor = encode_cursor([1.0, "2020-01-01T00:00:00+00:00", 1])
+        resp = self.client.get(f"/notes/?search-area=a&cursor={cursor}")
+        self.assertEqual(resp.status_code, 200)
+
+
+class NoteApiTestCase(TestCase):
+    """Tests the JSON API of notes"""
+
+    def test_api_requires_authentication(self):
+        """Test that not authorized user gets 401 instead of the redirect"""
+        resp = self.client.get("/api/v1/notes/")
+        self.assertEqual(resp.status_code, 401)
+
+    def test_api_lists_user_entries_with_requested_fields(self):
+        """Test that the list contains user's entries with the requested fields only"""
+        test_user_1 = create_test_user()
+        test_user_2 = create_test_user(username="test_user_2", password="password_2")
+        create_test_note(title="User 1 Title", user=test_user_1)
+        create_test_note(title="User 2 Title", user=test_user_2)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.get("/api/v1/notes/?fields=title,weight")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            resp.json(),
+            {
+                "results": [{"title": "User 1 Title", "weight": Weight.NORMAL}],
+                "next_cursor": None,
+            },
+        )
+
+    def test_api_filters_entries(self):
+        """Test that the list is filtered by the query string"""
+        test_user = create_test_user()
+        create_test_note(note_type=NoteType.NOTE, title="Note Title", user=test_user)
+        create_test_note(title="To do Title", user=test_user)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.get("/api/v1/notes/?type=notes&fields=title")
+        self.assertEqual(resp.json()["results"], [{"title": "Note Title"}])
+
+        resp = self.client.get("/api/v1/notes/?deadline=broken")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_api_creates_updates_and_deletes_entry(self):
+        """Test that the entry is created, partially updated and deleted"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+
+        new_note = {
+            "title": "New title",
+            "deadline": "2023-12-14",
+            "weight": Weight.HIGH,
+            "type": NoteType.TODO,
+        }
+        resp = self.client.post(
+            "/api/v1/notes/", new_note, content_type="application/json"
+        )
+        self.assertEqual(resp.status_code, 201)
+        note = Note.objects.get(pk=resp.json()["id"])
+        self.assertEqual(note.user, test_user)
+        self.assertEqual(note.weight, Weight.HIGH)
+
+        resp = self.client.patch(
+            f"/api/v1/notes/{note.id}/",
+            {"isComplete": True},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        note.refresh_from_db()
+        self.assertTrue(note.isComplete)
+        self.assertEqual(note.title, "New title")
+
+        resp = self.client.delete(f"/api/v1/notes/{note.id}/")
+        self.assertEqual(resp.status_code, 204)
+        self.assertFalse(Note.objects.filter(pk=note.id).exists())
+
+    def test_api_rejects_invalid_entry(self):
+        """Test that the entry without title is not created"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+        new_note = {
+            "desc": "Test text",
+            "deadline": "2023-12-14",
+            "weight": Weight.NORMAL,
+            "type": NoteType.TODO,
+        }
+        resp = self.client.post(
+            "/api/v1/notes/", new_note, content_type="application/json"
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("title", resp.json()["errors"])
+        self.assertEqual(Note.objects.count(), 0)
+
+    def test_api_hides_entries_of_other_users(self):
+        """Test that entries of other users are not found"""
+        create_test_user()
+        test_user_2 = create_test_user(username="test_user_2", password="password_2")
+        note = create_test_note(user=test_user_2)
+        self.client.login(username="test_user", password="password")
+
+        self.assertEqual(self.client.get(f"/api/v1/notes/{note.id}/").status_code, 404)
+        resp = self.client.delete(f"/api/v1/notes/{note.id}/")
+        self.assertEqual(resp.status_code, 404)
+        self.assertTrue(Note.objects.filter(pk=note.id).exists())
+
+    def test_api_checks_csrf_of_session_requests(self):
+        """Test that the session client needs the CSRF token to change entries"""
+        create_test_user()
+        client = Client(enforce_csrf_checks=True)
+        client.login(username="test_user", password="password")
+        new_note = {
+            "title": "CSRF Title",
+            "deadline": "2023-12-14",
+            "weight": Weight.NORMAL,
+            "type": NoteType.TODO,
+        }
+
+        resp = client.post("/api/v1/notes/", new_note, content_type="application/json")
+        self.assertEqual(resp.status_code, 403)
+        self.assertIn("CSRF", resp.json()["error"])
+        self.assertEqual(Note.objects.count(), 0)
+
+        # the pages set the cookie, which the client sends back in the header
+        client.get("/auth/login/")
+        resp = client.post(
+            "/api/v1/notes/",
+            new_note,
+            content_type="application/json",
+            headers={"X-CSRFToken": client.cookies["csrftoken"].value},
+        )
+        self.assertEqual(resp.status_code, 201)
+
+    def test_api_authenticates_by_token_without_csrf(self):
+        """Test that the token is issued, accepted without CSRF and revoked"""
+        test_user = create_test_user()
+        client = Client(enforce_csrf_checks=True)
+
+        resp = client.post(
+            "/api/v1/token/",
+            {"username": "test_user", "password": "wrong"},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 401)
+        resp = client.post(
+            "/api/v1/token/",
+            {"username": "test_user", "password": "password"},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        headers = {"Authorization": f"Token {resp.json()['token']}"}
+
+        resp = client.post(
+            "/api/v1/notes/",
+            {
+                "title": "Token Title",
+                "deadline": "2023-12-14",
+                "weight": Weight.NORMAL,
+                "type": NoteType.TODO,
+            },
+            content_type="application/json",
+            headers=headers,
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(Note.objects.get().user, test_user)
+
+        resp = client.delete("/api/v1/token/", headers=headers)
+        self.assertEqual(resp.status_code, 204)
+        resp = client.get("/api/v1/notes/", headers=headers)
+        self.assertEqual(resp.status_code, 401)
+        resp = client.get("/api/v1/notes/", headers={"Authorization": "Token x"})
+        self.assertEqual(resp.status_code, 401)
+
+    def test_api_datetimes_do_not_depend_on_orjson(self):
+        """Test that the fallback encoder formats datetimes like orjson"""
+        value = datetime(2023, 12, 14, 10, 30, 0, 123456, tzinfo=timezone.utc)
+        with patch("notes.api.orjson", None):
+            self.assertEqual(
+                json.loads(dump_json({"create_at": value})),
+                {"create_at": "2023-12-14T10:30:00.123456+00:00"},
+            )
+
+
+class BatchUpdateTasksTestCase(TestCase):
+    """Tests batch_update_tasks and the batch endpoint of the API"""
+
+    def test_redirect_if_not_logged_in(self):
+        """Test that not authorized user will be redirected to login page"""
+        resp = self.client.post("/notes/batch/", {"ids": [1], "operation": "complete"})
+        self.assertEqual(resp.status_code, 302)
+        self.assertTrue(resp.url.startswith("/auth/login/"))
+
+    def test_batch_completes_selected_user_tasks(self):
+        """Test that the selected user's tasks are completed and others are kept"""
+        test_user_1 = create_test_user()
+        test_user_2 = create_test_user(username="test_user_2", password="password_2")
+        task_1 = create_test_note(title="To do 1 Title", user=test_user_1)
+        task_2 = create_test_note(title="To do 2 Title", user=test_user_1)
+        other_task = create_test_note(title="User 2 Title", user=test_user_2)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.post(
+            "/notes/batch/?next=/notes/main/",
+            {"ids": [task_1.id, other_task.id], "operation": "complete"},
+        )
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp.url, "/notes/main/")
+
+        task_1.refresh_from_db()
+        task_2.refresh_from_db()
+        other_task.refresh_from_db()
+        self.assertTrue(task_1.isComplete)
+        self.assertFalse(task_2.isComplete)
+        self.assertFalse(other_task.isComplete)
+
+    def test_batch_rejects_unknown_operation(self):
+        """Test that the unknown operation is not applied"""
+        test_user = create_test_user()
+        task = create_test_note(user=test_user)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.post("/notes/batch/", {"ids": [task.id], "operation": "x"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_batch_without_selected_tasks_redirects_back_with_message(self):
+        """Test that the empty selection shows the message on the page once"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+        resp = self.client.get("/notes/all/")
+        etag = resp.headers["ETag"]
+
+        resp = self.client.post(
+            "/notes/batch/?next=/notes/all/", {"operation": "complete"}
+        )
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(resp.url, "/notes/all/")
+
+        # the page the client has does not show the message
+        resp = self.client.get("/notes/all/", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Select at least one task")
+        resp = self.client.get("/notes/all/")
+        self.assertNotContains(resp, "Select at least one task")
+
+    def test_batch_deletes_tasks_by_constant_number_of_queries(self):
+        """Test that the entries are deleted at once without the per-entry signals"""
+        test_user = create_test_user()
+        tasks = [
+            create_test_note(title=f"To do {number}", user=test_user)
+            for number in range(50)
+        ]
+        self.assertEqual(
+            get_title_suggestions(test_user, "tasks", "to", 1),
+            [(tasks[0].id, "To do 0")],
+        )
+        changed_at = Profile.objects.get(user=test_user).notes_changed_at
+
+        # savepoint, SELECT FOR UPDATE, DELETE, the profile UPDATE, release
+        with self.assertNumQueries(5):
+            apply_batch_operation(test_user, [task.id for task in tasks], "delete")
+
+        self.assertFalse(Note.objects.exists())
+        self.assertGreater(
+            Profile.objects.get(user=test_user).notes_changed_at, changed_at
+        )
+        self.assertEqual(get_title_suggestions(test_user, "tasks", "to", 1), [])
+
+    def test_batch_api_returns_result_of_each_entry(self):
+        """Test that the API reports changed and not found entries"""
+        test_user = create_test_user()
+        task = create_test_note(user=test_user)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.post(
+            "/api/v1/notes/batch/",
+            {"ids": [task.id, 0], "operation": "set_weight", "value": "High"},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            resp.json()["results"],
+            [{"id": task.id, "result": "ok"}, {"id": 0, "result": "not_found"}],
+        )
+        task.refresh_from_db()
+        self.assertEqual(task.weight, Weight.HIGH)
+
+        resp = self.client.post(
+            "/api/v1/notes/batch/",
+            {"ids": [task.id], "operation": "delete"},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(Note.objects.filter(pk=task.id).exists())
+
+
+class ExportNotesTestCase(TestCase):
+    """Tests export_notes"""
+
+    def test_redirect_if_not_logged_in(self):
+        """Test that not authorized user will be redirected to login page"""
+        resp = self.client.get("/notes/export.csv")
+        self.assertEqual(resp.status_code, 302)
+        self.assertTrue(resp.url.startswith("/auth/login/"))
+
+    def test_export_csv_contains_user_entries(self):
+        """Test that the CSV file contains user's entries with labels"""
+        test_user_1 = create_test_user()
+        test_user_2 = create_test_user(username="test_user_2", password="password_2")
+        create_test_note(title="User 1 Title", weight=Weight.HIGH, user=test_user_1)
+        create_test_note(title="User 2 Title", user=test_user_2)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.get("/notes/export.csv")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("attachment", resp["Content-Disposition"])
+
+        rows = list(csv.DictReader(io.StringIO(resp.getvalue().decode("utf8"))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["title"], "User 1 Title")
+        self.assertEqual(rows[0]["weight"], "High")
+        self.assertEqual(rows[0]["type"], "To do")
+
+    def test_export_ndjson_is_filtered(self):
+        """Test that the NDJSON file contains entries filtered by the query string"""
+        test_user = create_test_user()
+        create_test_note(note_type=NoteType.NOTE, title="Note Title", user=test_user)
+        create_test_note(title="To do Title", user=test_user)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.get("/notes/export.ndjson?type=notes")
+        self.assertEqual(resp.status_code, 200)
+
+        lines = resp.getvalue().decode("utf8").splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["title"] for row in rows], ["Note Title"])
+
+        resp = self.client.get("/notes/export.ndjson?isComplete=maybe")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_journal_exports_searched_entries(self):
+        """Test that the export links of the journal keep its search"""
+        test_user = create_test_user()
+        create_test_note(note_type=NoteType.NOTE, title="Trip plan", user=test_user)
+        create_test_note(note_type=NoteType.NOTE, title="Recipes", user=test_user)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.get("/notes/?search-area=trip plan")
+        url = "/notes/export.ndjson?type=notes&search=trip%20plan"
+        self.assertContains(resp, f'href="{url}"')
+
+        lines = self.client.get(url).getvalue().decode("utf8").splitlines()
+        self.assertEqual([json.loads(line)["title"] for line in lines], ["Trip plan"])
+
+
+class NoteImportViewTestCase(TestCase):
+    """Tests NoteImportView"""
+
+    def test_redirect_if_not_logged_in(self):
+        """Test that not authorized user will be redirected to login page"""
+        resp = self.client.get("/notes/import/")
+        self.assertEqual(resp.status_code, 302)
+        self.assertTrue(resp.url.startswith("/auth/login/"))
+
+    def test_import_csv_skips_invalid_rows(self):
+        """Test that valid rows are imported and invalid rows are reported"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        file = SimpleUploadedFile(
+            "notes.csv",
+            b"title,desc,deadline,weight,type\n"
+            b"Imported Title,Test text,2023-12-14,High,Event\n"
+            b",No title,2023-12-14,High,Event\n"
+            b"Bad Date Title,,2023-13-14,,\n",
+        )
+        resp = self.client.post("/notes/import/", {"file": file})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context_data["report"].created, 1)
+        self.assertEqual(resp.context_data["report"].skipped, 2)
+
+        note = Note.objects.get(user=test_user)
+        self.assertEqual(note.title, "Imported Title")
+        self.assertEqual(note.deadline, date(2023, 12, 14))
+        self.assertEqual(note.weight, Weight.HIGH)
+        self.assertEqual(note.type, NoteType.EVENT)
+
+    def test_import_ndjson_and_ics(self):
+        """Test that NDJSON lines and iCalendar events and to-dos are imported"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        file = SimpleUploadedFile(
+            "notes.ndjson",
+            b'{"title": "Note Title", "type": 1}\nnot json\n',
+        )
+        resp = self.client.post("/notes/import/", {"file": file})
+        self.assertEqual(resp.context_data["report"].skipped, 1)
+
+        file = SimpleUploadedFile(
+            "calendar.ics",
+            b"BEGIN:VCALENDAR\r\n"
+            b"BEGIN:VEVENT\r\nSUMMARY:Event Title\r\nDTSTART:20231214T100000Z\r\n"
+            b"END:VEVENT\r\n"
+            b"BEGIN:VTODO\r\nSUMMARY:To do Title\r\nSTATUS:COMPLETED\r\nEND:VTODO\r\n"
+            b"END:VCALENDAR\r\n",
+        )
+        self.client.post("/notes/import/", {"file": file})
+
+        notes = Note.objects.filter(user=test_user).order_by("id")
+        self.assertEqual(
+            [(note.title, note.type) for note in notes],
+            [
+                ("Note Title", NoteType.NOTE),
+                ("Event Title", NoteType.EVENT),
+                ("To do Title", NoteType.TODO),
+            ],
+        )
+        self.assertEqual(notes[1].deadline, date(2023, 12, 14))
+        self.assertTrue(notes[2].isComplete)
+
+    def test_import_requires_known_format(self):
+        """Test that the file of unknown format is not imported"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+        file = SimpleUploadedFile("notes.txt", b"title\nTest note\n")
+        resp = self.client.post("/notes/import/", {"file": file})
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("format", resp.context_data["form"].errors)
+        self.assertEqual(Note.objects.count(), 0)
+
+
+class CalendarFeedTestCase(TestCase):
+    """Tests calendar_feed"""
+
+    def get_feed_url(self, user):
+        """Returns the url of the user feed"""
+        return f"/notes/feed/{get_feed_token(user.profile)}.ics"
+
+    def test_feed_not_found_by_unknown_token(self):
+        """Test that the feed is not found by the wrong token"""
+        resp = self.client.get("/notes/feed/unknown.ics")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_feed_contains_user_tasks_only(self):
+        """Test that the feed contains user's tasks without notes"""
+        test_user_1 = create_test_user()
+        test_user_2 = create_test_user(username="test_user_2", password="password_2")
+        create_test_note(
+            note_type=NoteType.EVENT,
+            title="Event Title",
+            deadline="2023-12-14",
+            user=test_user_1,
+        )
+        create_test_note(note_type=NoteType.NOTE, title="Note Title", user=test_user_1)
+        create_test_note(title="User 2 Title", user=test_user_2)
+
+        resp = self.client.get(self.get_feed_url(test_user_1))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/calendar; charset=utf-8")
+
+        ics = resp.getvalue().decode("utf8")
+        self.assertIn("SUMMARY:Event Title\r\n", ics)
+        self.assertIn("DTSTART;VALUE=DATE:20231214\r\n", ics)
+        self.assertNotIn("Note Title", ics)
+        self.assertNotIn("User 2 Title", ics)
+
+    def test_feed_is_not_modified_until_tasks_change(self):
+        """Test that the feed is not generated again until the tasks are changed"""
+        test_user = create_test_user()
+        task = create_test_note(title="To do Title", user=test_user)
+        url = self.get_feed_url(test_user)
+
+        resp = self.client.get(url)
+        etag = resp["ETag"]
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        task.title = "New title"
+        task.save()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        etag = resp["ETag"]
+
+        task.delete()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn("New title", resp.getvalue().decode("utf8"))
+
+
+class ConditionalPageTestCase(TestCase):
+    """Tests ETag and Last-Modified of the pages of entries"""
+
+    def test_pages_are_not_modified_until_entries_change(self):
+        """Test that pages get 304 until any entry of the user is changed"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        note = create_test_note(user=test_user)
+
+        urls = ["/notes/main/", "/notes/", "/notes/all/", "/notes/notes/2023-12-14/"]
+        for url in urls:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            self.assertIn("Last-Modified", resp)
+            etag = resp["ETag"]
+
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(resp.status_code, 304)
+
+            # saves without changes are skipped
+            note.title = f"{note.title} {url}"
+            note.save()
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(resp.status_code, 200)
+
+    def test_page_is_modified_by_batch_operation(self):
+        """Test that changes without signals change the page too"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        task = create_test_note(user=test_user)
+        etag = self.client.get("/notes/all/")["ETag"]
+
+        self.client.post("/notes/batch/", {"ids": [task.id], "operation": "complete"})
+        resp = self.client.get("/notes/all/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_saves_of_unrendered_fields_do_not_change_pages(self):
+        """Test that saves of the fields not shown by the pages keep the version"""
+        test_user = create_test_user()
+        note = create_test_note(user=test_user)
+        changed_at = Profile.objects.get(user=test_user).notes_changed_at
+
+        with self.assertNumQueries(1):
+            note.save(update_fields=["desc_compressed", "desc_data"])
+        self.assertEqual(
+            Profile.objects.get(user=test_user).notes_changed_at, changed_at
+        )
+
+        note.weight = Weight.HIGH
+        note.save()
+        self.assertGreater(
+            Profile.objects.get(user=test_user).notes_changed_at, changed_at
+        )
+
+    def test_pages_are_modified_by_changes_in_other_processes(self):
+        """Test that the cached profile does not keep the old version of pages"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        create_test_note(title="Old title", user=test_user)
+        etag = self.client.get("/notes/all/")["ETag"]
+
+        # another process changes the entry and clears only its own cached user
+        with patch("notes.conditional.invalidate_cached_user"):
+            Note.objects.update(title="New title")
+            mark_notes_changed(test_user.pk)
+        resp = self.client.get("/notes/all/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "New title")
+
+    def test_pages_of_other_users_have_other_etags(self):
+        """Test that the page of the same url is different for another user"""
+        create_test_user()
+        create_test_user(username="test_user_2", password="password_2")
+        self.client.login(username="test_user", password="password")
+        etag = self.client.get("/notes/")["ETag"]
+        self.client.logout()
+
+        self.client.login(username="test_user_2", password="password_2")
+        resp = self.client.get("/notes/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+
+
+class ContentCacheTestCase(TestCase):
+    """Tests the cache of rendered entries of the pages"""
+
+    def test_entries_are_rendered_once_until_they_change(self):
+        """Test that the second page view reuses entries and changes render them"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        note = create_test_note(user=test_user, title="Cached title")
+        urls = ["/notes/main/", "/notes/all/", f"/notes/notes/{date.today()}/"]
+
+        for url in urls:
+            stats = get_content_cache_stats()
+            resp = self.client.get(url)
+            self.assertContains(resp, "Cached title")
+            resp = self.client.get(url)
+            self.assertContains(resp, "Cached title")
+            self.assertContains(resp, "csrfmiddlewaretoken")
+            new_stats = get_content_cache_stats()
+            self.assertEqual(new_stats["misses"] - stats["misses"], 1)
+            self.assertEqual(new_stats["hits"] - stats["hits"], 1)
+
+        note.title = "Changed title"
+        note.save()
+        for url in urls:
+            resp = self.client.get(url)
+            self.assertContains(resp, "Changed title")
+            self.assertNotContains(resp, "Cached title")
+
+    def test_entries_of_other_users_are_not_shared(self):
+        """Test that the same page of another user is rendered with their entries"""
+        test_user = create_test_user()
+        create_test_note(user=test_user, title="First user title")
+        create_test_user(username="test_user_2", password="password_2")
+        self.client.login(username="test_user", password="password")
+        self.assertContains(self.client.get("/notes/all/"), "First user title")
+        self.client.logout()
+
+        self.client.login(username="test_user_2", password="password_2")
+        resp = self.client.get("/notes/all/")
+        self.assertNotContains(resp, "First user title")
+
+
+class WeekGridViewTestCase(TestCase):
+    """Tests the fragment of the week swapped in place by the main page"""
+
+    def test_week_grid_has_entries_without_page_layout(self):
+        """Test that the fragment has entries of the week and links to the page"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        next_week = (date.today() + timedelta(days=7)).strftime("%Y-%m-%d")
+        create_test_note(title="Next week task", deadline=next_week, user=test_user)
+        create_test_note(title="Current week task", user=test_user)
+
+        resp = self.client.get("/notes/main/week/1")
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Next week task")
+        self.assertNotContains(resp, "Current week task")
+        self.assertNotContains(resp, "<html")
+        self.assertNotContains(resp, "Add Note")
+        self.assertContains(resp, "next=/notes/main/next/1")
+        self.assertContains(resp, 'data-week-url="/notes/main/week/2"')
+        self.assertContains(resp, 'data-week-url="/notes/main/week/0"')
+
+        resp = self.client.get("/notes/main/week/-1")
+        self.assertContains(resp, "next=/notes/main/prev/-1")
+
+    def test_main_page_links_week_grid(self):
+        """Test that the page has the fragment urls of the adjacent weeks"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.get("/notes/main/")
+        self.assertContains(resp, 'data-week-url="/notes/main/week/0"')
+        self.assertContains(resp, 'data-week-url="/notes/main/week/1"')
+        self.assertContains(resp, 'data-week-url="/notes/main/week/-1"')
+
+    def test_week_grid_is_not_modified(self):
+        """Test that the prefetched fragment gets 304 until entries change"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+
+        etag = self.client.get("/notes/main/week/1")["ETag"]
+        resp = self.client.get("/notes/main/week/1", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_invalid_week_count_is_not_found(self):
+        """Test that the week count which is not a number in range gets 404"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+
+        for url in [
+            "/notes/main/week/abc",
+            "/notes/main/week/1.5",
+            "/notes/main/week/99999999",
+            "/notes/main/next/abc",
+            "/notes/main/prev/--1",
+        ]:
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_week_grid_requires_login(self):
+        """Test that anonymous users are redirected to login"""
+        resp = self.client.get("/notes/main/week/1")
+        self.assertEqual(resp.status_code, 302)
+
+
+class CalendarViewTestCase(TestCase):
+    """Tests the calendar of numbers of tasks by days"""
+
+    def create_tasks(self, user):
+        """Creates tasks of two days of December 2023 and a note"""
+        create_test_note(deadline="2023-12-14", weight=Weight.HIGH, user=user)
+        create_test_note(
+            deadline="2023-12-14", weight=Weight.LOW, is_complete=True, user=user
+        )
+        create_test_note(deadline="2023-12-20", user=user)
+        create_test_note(deadline="2023-12-20", note_type=NoteType.NOTE, user=user)
+
+    def test_month_has_numbers_of_tasks_by_days(self):
+        """Test that days of the month have numbers of tasks and heat levels"""
+        test_user = create_test_user()
+        self.create_tasks(test_user)
+        self.client.login(username="test_user", password="password")
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get("/notes/calendar/2023/12/")
+        self.assertEqual(resp.status_code, 200)
+        notes_queries = [q for q in queries if "notes_note" in q["sql"]]
+        self.assertEqual(len(notes_queries), 1)
+
+        days = {
+            day["date"]: day
+            for week in resp.context["months"][0]["weeks"]
+            for day in week
+            if day
+        }
+        self.assertEqual(len(days), 31)
+        day = days[date(2023, 12, 14)]
+        self.assertEqual(day["counts"]["total"], 2)
+        self.assertEqual(day["counts"]["open"], 1)
+        self.assertEqual(day["counts"]["completed"], 1)
+        self.assertEqual(day["counts"]["high"], 1)
+        self.assertEqual(day["counts"]["low"], 1)
+        self.assertEqual(day["heat"], 4)
+        self.assertEqual(days[date(2023, 12, 20)]["counts"]["total"], 1)
+        self.assertEqual(days[date(2023, 12, 20)]["heat"], 2)
+        self.assertEqual(days[date(2023, 12, 1)]["heat"], 0)
+        self.assertEqual(resp.context["tasks_count"], 3)
+        self.assertContains(resp, "/notes/calendar/2023/11/")
+        self.assertContains(resp, "/notes/calendar/2024/1/")
+
+    def test_year_has_twelve_months(self):
+        """Test that the year is counted by one query too"""
+        test_user = create_test_user()
+        self.create_tasks(test_user)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.get("/notes/calendar/2023/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.context["months"]), 12)
+        self.assertEqual(resp.context["tasks_count"], 3)
+
+    def test_current_month_and_invalid_dates(self):
+        """Test the default month and 404 for invalid months"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.get("/notes/calendar/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["start_date"], date.today().replace(day=1))
+        self.assertEqual(self.client.get("/notes/calendar/2023/13/").status_code, 404)
+        self.assertEqual(self.client.get("/notes/calendar/0/").status_code, 404)
+        # the first and the last years have no neighbour years
+        for url in [
+            "/notes/calendar/1/",
+            "/notes/calendar/1/1/",
+            "/notes/calendar/9999/",
+            "/notes/calendar/9999/12/",
+        ]:
+            self.assertEqual(self.client.get(url).status_code, 404)
+        resp = self.client.get("/notes/calendar/9998/12/")
+        self.assertContains(resp, 'href="/notes/calendar/9998/11/"')
+        self.assertNotContains(resp, "/notes/calendar/9999/")
+
+    def test_calendar_api(self):
+        """Test numbers of tasks of the requested range as JSON"""
+        test_user = create_test_user()
+        self.create_tasks(test_user)
+        other_user = create_test_user(username="test_user_2", password="password_2")
+        create_test_note(deadline="2023-12-14", user=other_user)
+        self.client.login(username="test_user", password="password")
+
+        resp = self.client.get("/api/v1/calendar/?start=2023-12-01&end=2023-12-15")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            resp.json()["days"],
+            [
+                {
+                    "date": "2023-12-14",
+                    "total": 2,
+                    "open": 1,
+                    "completed": 1,
+                    "high": 1,
+                    "normal": 0,
+                    "low": 1,
+                }
+            ],
+        )
+
+        for query in [
+            "start=2023-12-15&end=2023-12-01",
+            "start=2023-12-01",
+            "start=2020-01-01&end=2023-12-01",
+        ]:
+            resp = self.client.get(f"/api/v1/calendar/?{query}")
+            self.assertEqual(resp.status_code, 400)
+
+
+class DirtyFieldsTestCase(TestCase):
+    """Tests that saving entries updates only their changed fields"""
+
+    def get_note_updates(self, url, data):
+        """Returns UPDATE queries of entries made by posting the data to the url"""
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(url, data=data)
+        self.assertEqual(resp.status_code, 302)
+        return [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith('UPDATE "notes_note"')
+        ]
+
+    def test_update_view_updates_changed_fields(self):
+        """Test that only the changed fields and updated_at are written"""
+        note = create_test_note()
+        self.client.login(username="test_user", password="password")
+        data = {
+            "title": note.title,
+            "desc": note.desc,
+            "type": note.type,
+            "isComplete": True,
+            "deadline": note.deadline,
+            "weight": note.weight,
+        }
+
+        updates = self.get_note_updates(f"/notes/note-update/{note.id}/", data)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"isComplete"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"title"', updates[0])
+        self.assertTrue(Note.objects.get(id=note.id).isComplete)
+
+    def test_save_without_changes_is_skipped(self):
+        """Test that saving the entry without changes does not query the database"""
+        note = create_test_note()
+        self.client.login(username="test_user", password="password")
+        data = {
+            "title": note.title,
+            "desc": note.desc,
+            "type": note.type,
+            "deadline": note.deadline,
+            "weight": note.weight,
+        }
+        self.assertEqual(
+            self.get_note_updates(f"/notes/note-update/{note.id}/", data), []
+        )
+
+        note = Note.objects.get(id=note.id)
+        with self.assertNumQueries(0):
+            note.save()
+        note.title = "Changed title"
+        note.save()
+        note = Note.objects.get(id=note.id)
+        self.assertEqual(note.title, "Changed title")
+
+
+class NoteQuerySetTestCase(TestCase):
+    """Tests filters of entries and owner checks of the entry pages"""
+
+    def test_filters_of_entries(self):
+        """Test that the filters select entries like the views need"""
+        test_user = create_test_user()
+        other_user = create_test_user(username="test_user_2", password="password_2")
+        today = date.today()
+        task = create_test_note(user=test_user)
+        completed = create_test_note(is_complete=True, user=test_user)
+        note = create_test_note(note_type=NoteType.NOTE, user=test_user)
+        later = create_test_note(deadline=today + timedelta(days=7), user=test_user)
+        create_test_note(user=other_user)
+
+        notes = Note.objects.for_user(test_user)
+        self.assertEqual(set(notes.tasks()), {task, completed, later})
+        self.assertEqual(list(notes.journal()), [note])
+        self.assertEqual(set(notes.tasks().open()), {task, later})
+        self.assertEqual(set(notes.tasks().day(today)), {task, completed})
+        self.assertEqual(set(notes.tasks().week(today)), {task, completed})
+        self.assertEqual(
+            set(notes.tasks().between(today, today + timedelta(days=7))),
+            {task, completed, later},
+        )
+
+    def test_entry_pages_of_other_users_are_not_found(self):
+        """Test that the entry pages look up entries of the user only"""
+        create_test_user()
+        other_user = create_test_user(username="test_user_2", password="password_2")
+        note = create_test_note(user=other_user)
+        self.client.login(username="test_user", password="password")
+
+        for url in ["note", "note-update", "note-delete"]:
+            resp = self.client.get(f"/notes/{url}/{note.id}/")
+            self.assertEqual(resp.status_code, 404)
+
+        resp = self.client.post(f"/notes/note-delete/{note.id}/")
+        self.assertEqual(resp.status_code, 404)
+        self.assertTrue(Note.objects.filter(id=note.id).exists())
+
+
+class NoteRowsTestCase(TestCase):
+    """Tests lists of entries loading previews instead of descriptions"""
+
+    def test_preview_is_stored_on_save(self):
+        """Test that the preview is the description or its beginning"""
+        note = create_test_note()
+        self.assertEqual(note.preview, "Test text")
+
+        note.desc = "x" * 500
+        note.save()
+        note = Note.objects.get(id=note.id)
+        self.assertEqual(len(note.preview), 200)
+        self.assertTrue(note.preview.endswith("…"))
+
+        note.desc = None
+        note.save(update_fields=["desc"])
+        self.assertEqual(Note.objects.get(id=note.id).preview, "")
+
+    def test_lists_do_not_load_descriptions(self):
+        """Test that list pages select previews and the detail page the description"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        long_desc = "Long description " * 50
+        task = create_test_note(user=test_user)
+        note = create_test_note(note_type=NoteType.NOTE, user=test_user)
+        for entry in [task, note]:
+            entry.desc = long_desc
+            entry.save()
+
+        urls = [
+            "/notes/main/",
+            "/notes/all/",
+            f"/notes/notes/{date.today()}/",
+            "/notes/",
+        ]
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                resp = self.client.get(url)
+            self.assertNotContains(resp, long_desc)
+            for query in queries:
+                if query["sql"].startswith("SELECT") and "notes_note" in query["sql"]:
+                    self.assertNotIn('"notes_note"."desc"', query["sql"])
+            if url != "/notes/main/":
+                self.assertContains(resp, "Long description")
+
+        resp = self.client.get(f"/notes/note/{task.id}/")
+        self.assertContains(resp, long_desc)
+
+
+@override_settings(NOTES_DESC_COMPRESSION=True, NOTES_DESC_COMPRESSION_THRESHOLD=1024)
+class DescCompressionTestCase(TestCase):
+    """Tests storing large descriptions compressed"""
+
+    long_desc = "Long description " * 500
+
+    def create_compressed_note(self, user):
+        """Creates the entry with the description above the threshold"""
+        note = create_test_note(user=user)
+        note.desc = self.long_desc
+        note.save()
+        return note
+
+    def test_large_description_is_compressed(self):
+        """Test that only large descriptions are stored compressed"""
+        note = self.create_compressed_note(create_test_user())
+        row = Note.objects.filter(id=note.id).values("desc", "desc_compressed").get()
+        self.assertEqual(row, {"desc": None, "desc_compressed": True})
+        self.assertLess(len(Note.objects.get(id=note.id).desc_data), 1024)
+        self.assertEqual(Note.objects.get(id=note.id).desc, self.long_desc)
+
+        note.desc = "Short text"
+        note.save()
+        note = Note.objects.get(id=note.id)
+        self.assertFalse(note.desc_compressed)
+        self.assertIsNone(note.desc_data)
+        self.assertEqual(note.desc, "Short text")
+
+    @override_settings(NOTES_DESC_COMPRESSION=False)
+    def test_disabled_compression_keeps_text(self):
+        """Test that descriptions are stored as text unless compression is enabled"""
+        note = self.create_compressed_note(create_test_user())
+        note = Note.objects.get(id=note.id)
+        self.assertFalse(note.desc_compressed)
+        self.assertEqual(note.desc, self.long_desc)
+
+    def test_changed_settings_move_read_description(self):
+        """Test that the read description is stored by the current settings"""
+        # the form does not change the text, which it would strip
+        desc = self.long_desc.strip()
+        note = create_test_note()
+        note.desc = desc
+        note.save()
+
+        with override_settings(NOTES_DESC_COMPRESSION=False):
+            note = Note.objects.get(id=note.id)
+            form = UpdateNoteForm(
+                data={**model_to_dict(note), "title": "New title"}, instance=note
+            )
+            self.assertTrue(form.is_valid(), form.errors)
+            form.save()
+        row = (
+            Note.objects.filter(id=note.id)
+            .values("title", "desc", "desc_compressed", "desc_data")
+            .get()
+        )
+        self.assertEqual(
+            row,
+            {
+                "title": "New title",
+                "desc": desc,
+                "desc_compressed": False,
+                "desc_data": None,
+            },
+        )
+
+        note = Note.objects.get(id=note.id)
+        self.assertEqual(note.desc, desc)
+        note.title = "Compressed title"
+        note.save()
+        row = Note.objects.filter(id=note.id).values("desc", "desc_compressed").get()
+        self.assertEqual(row, {"desc": None, "desc_compressed": True})
+        self.assertEqual(Note.objects.get(id=note.id).desc, desc)
+
+    def test_save_without_reading_keeps_description(self):
+        """Test that saving other fields keeps the compressed description"""
+        note = self.create_compressed_note(create_test_user())
+        note = Note.objects.get(id=note.id)
+        note.isComplete = True
+        with CaptureQueriesContext(connection) as queries:
+            note.save()
+        self.assertNotIn("desc", queries[0]["sql"])
+        self.assertNotIn("desc", note.__dict__)
+        self.assertEqual(Note.objects.get(id=note.id).desc, self.long_desc)
+
+    def test_pages_show_description(self):
+        """Test that the detail page, lists, search, export and API read the text"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        note = self.create_compressed_note(test_user)
+
+        resp = self.client.get(f"/notes/note/{note.id}/")
+        self.assertContains(resp, self.long_desc)
+
+        resp = self.client.get("/notes/all/?search-area=long description")
+        self.assertContains(resp, "Test note")
+        self.assertNotContains(resp, self.long_desc)
+
+        resp = self.client.get("/notes/export.csv")
+        rows = list(csv.DictReader(io.StringIO(resp.getvalue().decode("utf8"))))
+        self.assertEqual(rows[0]["desc"], self.long_desc)
+
+        resp = self.client.get(f"/api/v1/notes/{note.id}/?fields=title,desc")
+        self.assertEqual(resp.json(), {"title": "Test note", "desc": self.long_desc})
+        resp = self.client.get("/api/v1/notes/?fields=desc")
+        self.assertEqual(resp.json()["results"], [{"desc": self.long_desc}])
+
+
+    def test_search_matches_compressed_text(self):
+        """Test that words after the preview of compressed descriptions are found"""
+        test_user = create_test_user()
+        note = create_test_note(note_type=NoteType.NOTE, user=test_user)
+        note.desc = self.long_desc + "Needle at the end"
+        note.save()
+        self.assertNotIn("Needle", note.preview)
+
+        notes = search_notes(Note.objects.for_user(test_user), "needle")
+        self.assertEqual([found.id for found in notes], [note.id])
+        self.assertFalse(search_notes(Note.objects.for_user(test_user), "missing"))
+
+@patch("notes.views.get_user_weather", return_value=None)
+class MainViewWeekQueryTestCase(TestCase):
+    """Tests loading of the week grid of MainView"""
+
+    def test_week_is_loaded_by_one_query(self, get_user_weather):
+        """Test that the entries of the week are selected by one ordered query"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        start_date, _ = get_week_dates()
+        for day in range(7):
+            create_test_note(deadline=start_date + timedelta(days=day), user=test_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get("/notes/main/")
+        self.assertEqual(resp.status_code, 200)
+        note_queries = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("SELECT") and '"notes_note"' in query["sql"]
+        ]
+        self.assertEqual(len(note_queries), 1)
+        self.assertIn(
+            'ORDER BY "notes_note"."deadline" ASC, "notes_note"."weight" DESC, '
+            '"notes_note"."create_at" ASC',
+            note_queries[0],
+        )
+
+    def test_tasks_are_grouped_by_days_and_weight(self, get_user_weather):
+        """Test that open tasks of the week are put to their days by weight"""
+        test_user = create_test_user()
+        other_user = create_test_user(username="test_user_2")
+        self.client.login(username="test_user", password="password")
+        start_date, end_date = get_week_dates()
+        monday, wednesday = start_date, start_date + timedelta(days=2)
+
+        create_test_note("Low", deadline=monday, weight=Weight.LOW, user=test_user)
+        create_test_note("High", deadline=monday, weight=Weight.HIGH, user=test_user)
+        create_test_note("Normal", deadline=wednesday, user=test_user)
+        create_test_note("Done", deadline=monday, is_complete=True, user=test_user)
+        create_test_note(
+            "Journal", deadline=monday, note_type=NoteType.NOTE, user=test_user
+        )
+        create_test_note(
+            "Next week", deadline=end_date + timedelta(days=1), user=test_user
+        )
+        create_test_note("Other user", deadline=monday, user=other_user)
+
+        resp = self.client.get("/notes/main/")
+        titles = {
+            day: [task.title for task in tasks["tasks"]]
+            for day, tasks in resp.context["notes_week"].items()
+        }
+        self.assertEqual(titles["day1"], ["High", "Low"])
+        self.assertEqual(titles["day3"], ["Normal"])
+        self.assertEqual(sum(len(day_titles) for day_titles in titles.values()), 3)
+
+
+class WeatherCacheTestCase(TestCase):
+    """Tests get_weather serving weather info from the cache"""
+
+    weather_data = {
+        "cod": 200,
+        "name": "Kyiv",
+        "sys": {"country": "UA"},
+        "main": {"temp": 5.4, "feels_like": 2.6},
+        "weather": [{"icon": "01d", "description": "clear sky"}],
+        "wind": {"speed": 2},
+    }
+    weather_info = {
+        "location": "Kyiv, UA",
+        "temp": 5,
+        "icon": "01d",
+        "feels_like": 3,
+        "description": "clear sky",
+        "wind": {"speed": 2, "gust": "-"},
+    }
+
+    def setUp(self):
+        get_weather_cache().clear()
+        weather_breaker.record_success()
+        session_patcher = patch("utils.utils.weather_session")
+        self.session = session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+        self.session.get.return_value.json.return_value = self.weather_data
+
+    def test_weather_is_cached_for_ttl(self):
+        """Test that the service is requested once until the TTL expires"""
+        self.assertEqual(get_weather("Kyiv"), self.weather_info)
+        self.assertEqual(get_weather("Kyiv"), self.weather_info)
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertEqual(
+            get_weather_cache_stats(), {"hits": 1, "stale_hits": 0, "misses": 1}
+        )
+
+    def test_location_is_normalized(self):
+        """Test that spellings of the same location share the cache entry"""
+        get_weather("Kyiv")
+        self.assertEqual(get_weather("  KYIV "), self.weather_info)
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertNotEqual(
+            get_weather_cache_key("Kyiv"), get_weather_cache_key("Lviv")
+        )
+
+    def test_stale_weather_is_served_while_refreshing(self):
+        """Test that expired weather info is returned and refreshed in background"""
+        stale_info = {**self.weather_info, "temp": -5}
+        store_weather("Kyiv", stale_info, ttl=-1)
+
+        with patch("utils.utils.threading.Thread") as thread:
+            self.assertEqual(get_weather("Kyiv"), stale_info)
+            self.assertEqual(get_weather("Kyiv"), stale_info)
+        # the lock lets only one refresh run
+        thread.assert_called_once()
+        self.assertEqual(get_weather_cache_stats()["stale_hits"], 2)
+
+        # run the refresh started in background
+        thread.call_args.kwargs["target"]()
+        self.assertEqual(get_weather("Kyiv"), self.weather_info)
+
+    def test_unknown_city_is_cached(self):
+        """Test that the not found response is cached too"""
+        self.session.get.return_value.json.return_value = {
+            "cod": "404",
+            "message": "city not found",
+        }
+        self.assertIsNone(get_weather("Nowhere"))
+        self.assertIsNone(get_weather("Nowhere"))
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertEqual(get_weather_cache_stats()["hits"], 1)
+
+
+class AsyncMainUrls:
+    """Urls of the app serving the main page by AsyncMainView"""
+
+    urlpatterns = [
+        path("notes/main/", AsyncMainView.as_view(), name="main"),
+        path("", include("myNotes.urls")),
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncMainUrls)
+class AsyncMainViewTestCase(TestCase):
+    """Tests AsyncMainView"""
+
+    weather_info = {
+        "location": "Kyiv, UA",
+        "temp": 5,
+        "icon": "01d",
+        "feels_like": 3,
+        "description": "clear sky",
+        "wind": {"speed": 2, "gust": "-"},
+    }
+
+    async def test_redirect_if_not_logged_in(self):
+        """Test that not authorized user will be redirected to login page"""
+        resp = await self.async_client.get("/notes/main/")
+        self.assertEqual(resp.status_code, 302)
+        self.assertTrue(resp.url.startswith("/auth/login/"))
+
+    @override_settings(NOTES_DEFERRED_WEATHER=False)
+    @patch("notes.views.get_weather_async")
+    async def test_page_is_loaded_with_weather(self, get_weather_async):
+        """Test that the page shows the entries with weather info"""
+        get_weather_async.return_value = self.weather_info
+        test_user = await sync_to_async(create_test_user)()
+        await sync_to_async(create_test_note)(title="Week task", user=test_user)
+        await sync_to_async(self.async_client.login)(
+            username="test_user", password="password"
+        )
+
+        resp = await self.async_client.get("/notes/main/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Week task")
+        self.assertContains(resp, "Kyiv, UA")
+        get_weather_async.assert_awaited_once_with("Kyiv")
+
+    @override_settings(NOTES_DEFERRED_WEATHER=True)
+    async def test_unchanged_page_is_not_modified(self):
+        """Test that the repeated request of the unchanged page gets 304"""
+        await sync_to_async(create_test_user)()
+        await sync_to_async(self.async_client.login)(
+            username="test_user", password="password"
+        )
+
+        resp = await self.async_client.get("/notes/main/")
+        self.assertEqual(resp.status_code, 200)
+        resp = await self.async_client.get(
+            "/notes/main/", headers={"if-none-match": resp["ETag"]}
+        )
+        self.assertEqual(resp.status_code, 304)
+
+
+class AsyncWeatherTestCase(TestCase):
+    """Tests the async weather client"""
+
+    def setUp(self):
+        get_weather_cache().clear()
+
+    async def test_concurrent_misses_request_weather_once(self):
+        """Test that concurrent requests of the missing location share one fetch"""
+
+        async def fetch_weather(city):
+            await asyncio.sleep(0.01)
+            return {"location": city}
+
+        with patch(
+            "utils.async_weather.fetch_weather_async", side_effect=fetch_weather
+        ) as fetch_weather_async:
+            results = await asyncio.gather(
+                *[get_weather_async("Kyiv") for _ in range(5)]
+            )
+        self.assertEqual(results, [{"location": "Kyiv"}] * 5)
+        fetch_weather_async.assert_awaited_once()
+
+    def test_session_is_closed_with_event_loop(self):
+        """Test that the session of the finished event loop is closed"""
+
+        async def use_session():
+            return get_session()
+
+        first_session = async_to_sync(use_session)()
+        second_session = async_to_sync(use_session)()
+        self.assertTrue(first_session.closed)
+        self.assertTrue(second_session.closed)
+        self.assertIsNot(first_session, second_session)
+
+
+class WeatherCircuitBreakerTestCase(TestCase):
+    """Tests fetch_weather failing fast while the weather service is down"""
+
+    weather_data = WeatherCacheTestCase.weather_data
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=3, cooldown=30)
+        breaker_patcher = patch("utils.utils.weather_breaker", self.breaker)
+        breaker_patcher.start()
+        self.addCleanup(breaker_patcher.stop)
+        session_patcher = patch("utils.utils.weather_session")
+        self.session = session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+
+    def test_breaker_opens_after_failures_and_probes_after_cooldown(self):
+        """Test that requests stop after the threshold and one probe closes it"""
+        self.session.get.side_effect = requests.ConnectionError("down")
+        for _ in range(3):
+            self.assertIsNone(fetch_weather("Kyiv"))
+        self.assertTrue(self.breaker.is_open)
+
+        # the open breaker does not request the service
+        self.assertIsNone(fetch_weather("Kyiv"))
+        self.assertEqual(self.session.get.call_count, 3)
+
+        self.session.get.side_effect = None
+        self.session.get.return_value.json.return_value = self.weather_data
+        with patch("utils.utils.time.monotonic", return_value=monotonic() + 31):
+            self.assertTrue(self.breaker.allow_request())
+            # only one probe is let through at a time
+            self.assertFalse(self.breaker.allow_request())
+            self.breaker.is_probing = False
+            self.assertEqual(fetch_weather("Kyiv")["location"], "Kyiv, UA")
+        self.assertFalse(self.breaker.is_open)
+        self.assertEqual(self.session.get.call_count, 4)
+
+    def test_failed_probe_opens_breaker_again(self):
+        """Test that the failed probe keeps requests rejected for the cooldown"""
+        self.session.get.side_effect = requests.Timeout("slow")
+        for _ in range(3):
+            fetch_weather("Kyiv")
+
+        probe_time = monotonic() + 31
+        with patch("utils.utils.time.monotonic", return_value=probe_time):
+            self.assertIsNone(fetch_weather("Kyiv"))
+            self.assertEqual(self.session.get.call_count, 4)
+            self.assertIsNone(fetch_weather("Kyiv"))
+        self.assertEqual(self.session.get.call_count, 4)
+
+    def test_unknown_city_is_not_requested_again(self):
+        """Test that the not found response is raised without another request"""
+        self.session.get.return_value.json.return_value = {
+            "cod": "404",
+            "message": "city not found",
+        }
+        with self.assertRaises(CityNotFoundError):
+            fetch_weather("Nowhere")
+        self.session.get.assert_called_once()
+        # the service answered, so it is not counted as a failure
+        self.assertEqual(self.breaker.failures, 0)
+
+
+class FakeWeatherHandler(BaseHTTPRequestHandler):
+    """Answer like the weather service knowing Kyiv and Lviv only"""
+
+    def do_GET(self):
+        city = parse_qs(urlparse(self.path).query)["q"][0]
+        if city in ("Kyiv", "Lviv"):
+            data = {**WeatherCacheTestCase.weather_data, "name": city}
+        else:
+            data = {"cod": "404", "message": "city not found"}
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PrefetchWeatherTestCase(TestCase):
+    """Tests the prefetch_weather command against a local fake weather server"""
+
+    def setUp(self):
+        get_weather_cache().clear()
+        server = HTTPServer(("127.0.0.1", 0), FakeWeatherHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        for target, value in [
+            ("utils.utils.BASE_URL", f"http://127.0.0.1:{server.server_port}/"),
+            ("utils.utils.weather_breaker", CircuitBreaker(5, 30)),
+        ]:
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_profile_locations_are_warmed(self):
+        """Test that each distinct location is requested and cached"""
+        for username, location in [
+            ("test_user", "Lviv"),
+            ("test_user_2", " LVIV "),
+            ("test_user_3", "Nowhere"),
+        ]:
+            profile = create_test_user(username=username).profile
+            profile.location = location
+            profile.save()
+
+        out = io.StringIO()
+        call_command("prefetch_weather", workers=2, stdout=out)
+        self.assertIn("3 locations", out.getvalue())
+        self.assertIn("2 warmed, 1 not found, 0 failed", out.getvalue())
+
+        with patch("utils.utils.weather_session") as session:
+            self.assertEqual(get_weather("Kyiv")["location"], "Kyiv, UA")
+            self.assertEqual(get_weather("lviv")["location"], "Lviv, UA")
+            self.assertIsNone(get_weather("Nowhere"))
+        session.get.assert_not_called()
+
+
+class SearchNotesTestCase(TestCase):
+    """Tests search_notes"""
+
+    def setUp(self):
+        self.test_user = create_test_user()
+        self.title_match = create_test_note(
+            title="Garden plan", note_type=NoteType.NOTE, user=self.test_user
+        )
+        self.desc_match = create_test_note(
+            title="Weekend", note_type=NoteType.NOTE, user=self.test_user
+        )
+        self.desc_match.desc = "Buy seeds for the garden"
+        self.desc_match.save()
+        create_test_note(title="Other", note_type=NoteType.NOTE, user=self.test_user)
+
+    def search(self, search_input):
+        """Returns entries of the user found by the input ordered like the journal"""
+        return list(
+            search_notes(Note.objects.for_user(self.test_user), search_input).order_by(
+                "-rank", "-create_at", "-id"
+            )
+        )
+
+    @skipIf(connection.vendor == "postgresql", "full-text search is used instead")
+    def test_fallback_matches_title_and_description(self):
+        """Test that the fallback finds the input in titles and descriptions"""
+        notes = self.search("GARDEN")
+        self.assertEqual(
+            {note.id for note in notes}, {self.title_match.id, self.desc_match.id}
+        )
+        self.assertEqual({note.rank for note in notes}, {0.0})
+        self.assertEqual({note.headline for note in notes}, {None})
+
+    @skipUnless(connection.vendor == "postgresql", "requires full-text search")
+    def test_title_matches_rank_higher(self):
+        """Test that matches in titles rank above matches in descriptions"""
+        notes = self.search("gardens")
+        self.assertEqual(
+            [note.id for note in notes], [self.title_match.id, self.desc_match.id]
+        )
+        self.assertGreater(notes[0].rank, notes[1].rank)
+
+    @skipUnless(connection.vendor == "postgresql", "requires full-text search")
+    def test_headline_marks_matched_words(self):
+        """Test that the headline of the description marks the matched words"""
+        notes = self.search("seeds")
+        self.assertEqual(len(notes), 1)
+        self.assertIn(f"{HIGHLIGHT_START}seeds{HIGHLIGHT_STOP}", notes[0].headline)
+
+    def test_highlight_escapes_headline(self):
+        """Test that the headline is escaped before the matches are marked"""
+        headline = f"<b>{HIGHLIGHT_START}seeds{HIGHLIGHT_STOP}</b>"
+        self.assertEqual(highlight(headline), "&lt;b&gt;<mark>seeds</mark>&lt;/b&gt;")
+
+    def test_journal_shows_found_entries(self):
+        """Test that the journal lists only the entries found by the input"""
+        self.client.login(username="test_user", password="password")
+        resp = self.client.get("/notes/?search-area=garden")
+        self.assertEqual(
+            {note.id for note in resp.context["notes"]},
+            {self.title_match.id, self.desc_match.id},
+        )
@@ -1,23 +1,58 @@
 """Define app url handlers"""
-from django.urls import path
+from django.conf import settings
+from django.urls import path, register_converter
 
+from .converters import WeekCountConverter
 from .views import (
+    AsyncMainView,
+    CalendarView,
     DeleteNoteView,
     MainView,
     NoteCreateView,
     NoteDetailView,
+    NoteImportView,
     NoteListView,
     NoteUpdateView,
     TasksAllListView,
     TasksDayListView,
+    WeekGridView,
+    autocomplete_titles,
+    batch_update_tasks,
+    calendar_feed,
+    export_notes,
     get_day,
+    weather_widget,
 )
 
+register_converter(WeekCountConverter, "week")
+
+main_view = AsyncMainView if settings.NOTES_ASYNC_MAIN_VIEW else MainView
+
 urlpatterns = [
-    path("main/", MainView.as_view(), name="main"),
-    path("main/next/<str:count>", MainView.as_view(), name="note-by-week-next"),
-    path("main/prev/<str:count>", MainView.as_view(), name="note-by-week-prev"),
+    path("main/", main_view.as_view(), name="main"),
+    path("main/next/<week:count>", main_view.as_view(), name="note-by-week-next"),
+    path("main/prev/<week:count>", main_view.as_view(), name="note-by-week-prev"),
+    path("main/week/<week:count>", WeekGridView.as_view(), name="week-grid"),
+    path("calendar/", CalendarView.as_view(), name="calendar"),
+    path("calendar/<int:year>/", CalendarView.as_view(), name="calendar-year"),
+    path(
+        "calendar/<int:year>/<int:month>/",
+        CalendarView.as_view(),
+        name="calendar-month",
+    ),
     path("day/", get_day, name="day"),
+    path("weather/", weather_widget, name="weather"),
+    path("autocomplete/", autocomplete_titles, name="autocomplete"),
+    path("batch/", batch_update_tasks, name="tasks-batch"),
+    path("export.csv", export_notes, {"export_format": "csv"}, name="export-csv"),
+    path(
+        "export.ndjson",
+        export_notes,
+        {"export_format": "ndjson"},
+        name="export-ndjson",
+    ),
+    path("import/", NoteImportView.as_view(), name="notes-import"),
+    path("feed/<str:token>.ics", calendar_feed, name="calendar-feed"),
     path("note-create/", NoteCreateView.as_view(), name="note-create"),
     path("note/<int:pk>/", NoteDetailView.as_view(), name="note"),
     path("note-update/<int:pk>/", NoteUpdateView.as_view(), name="note-update"),
@@ -1,23 +1,72 @@
 """
     Define views for render pages
 """
-from datetime import datetime, timedelta
+import asyncio
+import calendar
+from datetime import MAXYEAR, MINYEAR, date, datetime, timedelta
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST, require_safe
+from django.views.decorators.vary import vary_on_cookie
 from django.views.generic.detail import DetailView
-from django.views.generic.edit import CreateView, DeleteView, UpdateView
+from django.views.generic.edit import CreateView, DeleteView, FormView, UpdateView
+from django.views.generic.base import TemplateView
 from django.views.generic.list import ListView
 
-from utils.constants import WEEK_DAYS
-from utils.utils import get_last_monday, get_weather
-
-from .forms import CreateNoteForm, UpdateNoteForm
+from utils.async_weather import get_weather_async
+from utils.constants import WEEK_DAYS, NoteType
+from utils.utils import get_weather, get_week_dates
+
+from .autocomplete import get_title_suggestions
+from .batch import BatchOperationError, apply_batch_operation
+from .calendar_counts import get_calendar_months, get_day_counts
+from .conditional import ConditionalPageMixin
+from .content_cache import CachedContentMixin
+from .export import EXPORT_FORMATS, iter_ics
+from .feed import (
+    get_feed_etag,
+    get_feed_last_modified,
+    get_feed_notes,
+    get_feed_state,
+)
+from .filters import FilterError, filter_notes
+from .forms import CreateNoteForm, ImportNotesForm, UpdateNoteForm
+from .imports import get_import_format, import_notes, read_lines
 from .models import Note
+from .pagination import KeysetPaginationMixin
+from .search import search_notes
+
+
+def get_user_location(user):
+    """Define the location of weather info for the user"""
+    return user.profile.location or "Kyiv"
 
 
-class MainView(LoginRequiredMixin, ListView):
+def get_user_weather(user):
+    """Get weather info for the user location"""
+    try:
+        return get_weather(get_user_location(user))
+    except Exception as err:
+        print(err)
+        return None
+
+
+class MainView(LoginRequiredMixin, ConditionalPageMixin, CachedContentMixin, ListView):
     """
     Show the page with entries excluding the type 'note'
     with isComplete status 'false'
@@ -26,56 +75,146 @@ class MainView(LoginRequiredMixin, ListView):
 
     model = Note
     template_name = "notes/templates/notes/main.html"
+    content_template_name = "notes/templates/notes/week_grid.html"
     context_object_name = "notes"
 
-    # get date of last Monday
-    start_date = get_last_monday()
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    def get_week_dates(self):
+        """Define dates of target week for the current request"""
+        if not hasattr(self, "_week_dates"):
+            self._week_dates = get_week_dates(self.kwargs.get("count", 0))
+        return self._week_dates
+
+    def get_queryset(self):
+        start_date, _ = self.get_week_dates()
+
+        # returns uncompleted entries of the target week excluding the type 'note'
+        # with one query ordered by day and weight
+        return (
+            super()
+            .get_queryset()
+            .for_user(self.request.user)
+            .tasks()
+            .open()
+            .week(start_date)
+            .order_by("deadline", "-weight", "create_at")
+            .rows()
+        )
 
-        # add to context weather info
-        location = self.request.user.profile.location or "Kyiv"
+    def get_page_validators(self):
+        # the page with weather info changes without changes of the entries
+        if not settings.NOTES_DEFERRED_WEATHER:
+            return None
+        return super().get_page_validators()
 
-        try:
-            weather_info = get_weather(location)
-        except Exception as err:
-            print(err)
-            weather_info = None
+    def get_page_path(self):
+        """Define the path of the page of target week used in links of the entries"""
+        return self.request.path
 
-        context["weather"] = weather_info
+    def get_location(self):
+        """Define the location of weather info"""
+        return get_user_location(self.request.user)
 
-        context["notes"] = context["notes"].filter(user=self.request.user)
+    def get_weather_info(self):
+        """Get weather info for the user location"""
+        return get_user_weather(self.request.user)
 
-        # returns entries excluding the type 'note'
-        context["notes"] = context["notes"].exclude(isComplete="True")
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
 
-        # returns entries excluding the type 'note'
-        context["notes"] = context["notes"].exclude(type="Note")
+        # add to context weather info if it was not loaded yet
+        # or let the page load it from the weather widget endpoint
+        context["defer_weather"] = settings.NOTES_DEFERRED_WEATHER
+        if "weather" not in context and not settings.NOTES_DEFERRED_WEATHER:
+            context["weather"] = self.get_weather_info()
 
         # define dates of target week
+        start_date, end_date = self.get_week_dates()
         context["week_count"] = self.kwargs.get("count", 0)
-        if "next" in self.request.path or "prev" in self.request.path:
-            self.start_date += timedelta(days=7 * int(self.kwargs["count"]))
-        context["start_date"] = self.start_date
-        context["end_date"] = self.start_date + timedelta(days=6)
+        context["page_path"] = self.get_page_path()
+        context["start_date"] = start_date
+        context["end_date"] = end_date
+
+        return context
 
+    def get_content_data(self, context):
         # organizing data by week days with ordering it by weight
-        notes_week = {value: {} for _, value in enumerate(WEEK_DAYS)}
+        notes_week = {}
+        days_by_date = {}
         for i, day in enumerate(WEEK_DAYS):
-            current_date = self.start_date + timedelta(days=i)
-            notes_week[day]["date"] = current_date
-            notes_week[day]["tasks"] = (
-                context["notes"]
-                .filter(deadline=current_date)
-                .order_by("weight", "create_at")
-            )
-            context["notes_week"] = notes_week
+            current_date = context["start_date"] + timedelta(days=i)
+            notes_week[day] = {"date": current_date, "tasks": []}
+            days_by_date[current_date] = notes_week[day]
+        for task in context["notes"]:
+            days_by_date[task.deadline]["tasks"].append(task)
+        return {"notes_week": notes_week}
 
-        return context
 
+class WeekGridView(MainView):
+    """
+    Show only the entries of the target week without the page layout,
+    which the main page swaps in place when navigating between weeks.
+    """
+
+    def get_page_validators(self):
+        # the fragment has no weather info
+        return super(MainView, self).get_page_validators()
+
+    def get_page_path(self):
+        week_count = self.kwargs.get("count", 0)
+        url_name = "note-by-week-prev" if week_count < 0 else "note-by-week-next"
+        return reverse(url_name, args=[week_count])
+
+    def get_context_data(self, **kwargs):
+        # the fragment does not show weather info, so do not load it
+        return super().get_context_data(weather=None, **kwargs)
 
-class NoteListView(LoginRequiredMixin, ListView):
+    def render_to_response(self, context, **response_kwargs):
+        return HttpResponse(self.get_content(context), **response_kwargs)
+
+
+class AsyncMainView(MainView):
+    """
+    Show the same page as MainView
+    loading weather info at the same time as the entries of the target week.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        # the user is loaded lazily from the session, so check it in a sync thread
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return self.handle_no_permission()
+        return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
+
+    async def get_weather_info_async(self):
+        """Get weather info for the user location without blocking the event loop"""
+        try:
+            location = await sync_to_async(self.get_location)()
+            return await get_weather_async(location)
+        except Exception as err:
+            print(err)
+            return None
+
+    def get_weather_info(self):
+        # weather info is loaded by get() at the same time as the entries
+        return None
+
+    async def get(self, request, *args, **kwargs):
+        if settings.NOTES_DEFERRED_WEATHER:
+            return await sync_to_async(super().get)(request, *args, **kwargs)
+
+        # page latency is max(db, weather) rather than the sum
+        weather_info, response = await asyncio.gather(
+            self.get_weather_info_async(),
+            sync_to_async(super().get)(request, *args, **kwargs),
+        )
+        # the template response is rendered after the view returns it
+        response.context_data["weather"] = weather_info
+        return response
+
+
+class NoteListView(
+    LoginRequiredMixin, ConditionalPageMixin, KeysetPaginationMixin, ListView
+):
     """
     Show the page with all entries with type 'note' ordered by creation date.
     """
@@ -85,24 +224,29 @@ class NoteListView(LoginRequiredMixin, ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["notes"] = context["notes"].filter(user=self.request.user)
+        # returns entries of the user with type 'note' only
+        context["notes"] = context["notes"].for_user(self.request.user).journal()
 
-        # returns entries with type 'note' only
-        context["notes"] = context["notes"].filter(type="Note")
+        # ordering data by creation date
+        ordering = ["-create_at", "-id"]
 
-        # filter data by search query
+        # filter data by search query with ordering by relevance
         search_input = self.request.GET.get("search-area") or ""
         if search_input != "":
-            context["notes"] = context["notes"].filter(title__icontains=search_input)
+            context["notes"] = search_notes(context["notes"], search_input)
+            ordering = ["-rank", *ordering]
         context["search_input"] = search_input
 
-        # ordering data by creation date
-        context["notes"] = context["notes"].order_by("-create_at")
+        context["notes"], context["next_page_query"] = self.paginate_by_keyset(
+            context["notes"].rows(), ordering
+        )
 
         return context
 
 
-class TasksDayListView(LoginRequiredMixin, ListView):
+class TasksDayListView(
+    LoginRequiredMixin, ConditionalPageMixin, CachedContentMixin, ListView
+):
     """
     Show the page with all entries excluding notes by target day.
     """
@@ -110,33 +254,39 @@ class TasksDayListView(LoginRequiredMixin, ListView):
     model = Note
     context_object_name = "tasks"
     template_name = "notes/templates/notes/tasks_day_list.html"
+    content_template_name = "notes/templates/notes/task_list.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["tasks"] = context["tasks"].filter(user=self.request.user)
-
-        # returns entries excluding the type 'note'
-        context["tasks"] = context["tasks"].exclude(type="Note")
+        # returns entries of the user excluding the type 'note'
+        context["tasks"] = context["tasks"].for_user(self.request.user).tasks()
 
         # filter data by target date with ordering by status and weight
         target_date = self.kwargs["deadline"]
         context["by_date"] = target_date
         context["tasks"] = (
             context["tasks"]
-            .filter(deadline=target_date)
-            .order_by("isComplete", "weight", "create_at")
+            .day(target_date)
+            .order_by("isComplete", "-weight", "create_at")
         )
 
         # filter data by search query
         search_input = self.request.GET.get("search-area") or ""
         if search_input != "":
-            context["tasks"] = context["tasks"].filter(title__icontains=search_input)
+            context["tasks"] = search_notes(context["tasks"], search_input)
         context["search_input"] = search_input
+        context["tasks"] = context["tasks"].rows()
 
         return context
 
 
-class TasksAllListView(LoginRequiredMixin, ListView):
+class TasksAllListView(
+    LoginRequiredMixin,
+    ConditionalPageMixin,
+    CachedContentMixin,
+    KeysetPaginationMixin,
+    ListView,
+):
     """
     Show the page with all entries excluding notes
     """
@@ -144,30 +294,96 @@ class TasksAllListView(LoginRequiredMixin, ListView):
     model = Note
     context_object_name = "tasks"
     template_name = "notes/templates/notes/tasks_day_list.html"
+    content_template_name = "notes/templates/notes/task_list.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["tasks"] = context["tasks"].filter(user=self.request.user)
-
-        # returns entries excluding the type 'note'
-        context["tasks"] = context["tasks"].exclude(type="Note")
+        # returns entries of the user excluding the type 'note'
+        context["tasks"] = context["tasks"].for_user(self.request.user).tasks()
 
         context["by_date"] = "All time"
-        # ordering data by status and weight
-        context["tasks"] = context["tasks"].order_by(
-            "isComplete", "weight", "create_at"
-        )
 
         # filter data by search query
         search_input = self.request.GET.get("search-area") or ""
         if search_input != "":
-            context["tasks"] = context["tasks"].filter(title__icontains=search_input)
+            context["tasks"] = search_notes(context["tasks"], search_input)
         context["search_input"] = search_input
 
         return context
 
+    def get_content_data(self, context):
+        # ordering data by status and weight
+        tasks, next_page_query = self.paginate_by_keyset(
+            context["tasks"].rows(), ["isComplete", "-weight", "create_at", "id"]
+        )
+        return {"tasks": tasks, "next_page_query": next_page_query}
+
+
+class CalendarView(LoginRequiredMixin, ConditionalPageMixin, TemplateView):
+    """
+    Show the heatmap of numbers of tasks by days of the month or the year
+    counted by one grouped query over the whole range.
+    """
 
-class NoteDetailView(LoginRequiredMixin, DetailView):
+    template_name = "notes/templates/notes/calendar.html"
+
+    def get_range(self):
+        """Define the first and the last dates of the month or the year"""
+        today = date.today()
+        year = self.kwargs.get("year", today.year)
+        month = self.kwargs.get("month")
+        if month is None and "year" not in self.kwargs:
+            month = today.month
+        # the first and the last years have no neighbours to link and to show
+        # the days of the weeks around them
+        if not MINYEAR < year < MAXYEAR:
+            raise Http404("Invalid calendar date")
+
+        try:
+            if month is None:
+                return date(year, 1, 1), date(year, 12, 31)
+            _, days_count = calendar.monthrange(year, month)
+            return date(year, month, 1), date(year, month, days_count)
+        except ValueError as err:
+            raise Http404("Invalid calendar date") from err
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        start_date, end_date = self.get_range()
+        day_counts = get_day_counts(self.request.user, start_date, end_date)
+
+        context["months"] = get_calendar_months(start_date, end_date, day_counts)
+        context["is_year"] = start_date.month != end_date.month
+        context["start_date"] = start_date
+        context["today"] = date.today()
+        context["tasks_count"] = sum(counts["total"] for counts in day_counts.values())
+
+        # links to the previous and the next month or year shown by the calendar
+        prev_date = start_date - timedelta(days=1)
+        next_date = end_date + timedelta(days=1)
+        for name, link_date in [("prev_url", prev_date), ("next_url", next_date)]:
+            if not MINYEAR < link_date.year < MAXYEAR:
+                continue
+            if context["is_year"]:
+                context[name] = reverse("calendar-year", args=[link_date.year])
+            else:
+                context[name] = reverse(
+                    "calendar-month", args=[link_date.year, link_date.month]
+                )
+        return context
+
+
+class OwnerNotesMixin:
+    """
+    Look up the entry by id among the entries of the user,
+    so entries of other users are not found.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().for_user(self.request.user)
+
+
+class NoteDetailView(LoginRequiredMixin, OwnerNotesMixin, DetailView):
     """Show the page with notes details."""
 
     model = Note
@@ -211,7 +427,9 @@ class NoteCreateView(LoginRequiredMixin, CreateView):
         # check if the request set has a type attribute
         entire_type = self.request.GET.get("type", "")
         if entire_type:
-            initial["type"] = entire_type
+            # the type may be passed by its label
+            types_by_label = {label: value for value, label in NoteType.choices}
+            initial["type"] = types_by_label.get(entire_type, entire_type)
 
         return initial
 
@@ -234,7 +452,7 @@ class NoteCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class NoteUpdateView(LoginRequiredMixin, UpdateView):
+class NoteUpdateView(LoginRequiredMixin, OwnerNotesMixin, UpdateView):
     """
     Show the page with form for updating notes by id.
     Redirect user to page with notes on deadline day
@@ -263,7 +481,7 @@ class NoteUpdateView(LoginRequiredMixin, UpdateView):
         return super().form_valid(form)
 
 
-class DeleteNoteView(LoginRequiredMixin, DeleteView):
+class DeleteNoteView(LoginRequiredMixin, OwnerNotesMixin, DeleteView):
     """
     Show the confirmation page before deleting notes by id.
     Redirect user to page with notes on deadline day
@@ -285,8 +503,114 @@ class DeleteNoteView(LoginRequiredMixin, DeleteView):
         return url
 
 
+class NoteImportView(LoginRequiredMixin, FormView):
+    """
+    Show the page with form for importing notes from the file
+    and the report of the import.
+    """
+
+    form_class = ImportNotesForm
+    template_name = "notes/templates/notes/note_import.html"
+
+    def form_valid(self, form):
+        file = form.cleaned_data["file"]
+        import_format = form.cleaned_data["format"] or get_import_format(file.name)
+        if import_format is None:
+            form.add_error("format", "Select the format of the file")
+            return self.form_invalid(form)
+
+        report = import_notes(self.request.user, read_lines(file), import_format)
+        return self.render_to_response(
+            self.get_context_data(form=self.form_class(), report=report)
+        )
+
+
 @login_required
 def get_day(request):
     """Redirect user to page with notes on target day"""
     current_date = request.POST.get("deadline", datetime.today().strftime("%Y-%m-%d"))
     return redirect(f"/notes/notes/{current_date}/")
+
+
+@login_required
+@cache_control(private=True, max_age=settings.WEATHER_CACHE_TTL)
+@vary_on_cookie
+def weather_widget(request):
+    """Show the weather widget for the user location or return it as JSON"""
+    weather_info = get_user_weather(request.user)
+    if request.GET.get("format") == "json":
+        return JsonResponse({"weather": weather_info})
+    return render(
+        request,
+        "notes/templates/notes/weather_widget.html",
+        {"weather": weather_info},
+    )
+
+
+@login_required
+def autocomplete_titles(request):
+    """Return titles of the user entries matching the typed search query"""
+    query = request.GET.get("q", "").strip()
+    scope = "notes" if request.GET.get("scope") == "notes" else "tasks"
+    suggestions = []
+    if query:
+        suggestions = get_title_suggestions(
+            request.user, scope, query, settings.NOTES_AUTOCOMPLETE_LIMIT
+        )
+    return JsonResponse(
+        {"results": [{"id": note_id, "title": title} for note_id, title in suggestions]}
+    )
+
+
+@login_required
+@require_POST
+def batch_update_tasks(request):
+    """Apply the operation to the selected tasks and redirect user back"""
+    url = request.GET.get("next", "")
+    if not url_has_allowed_host_and_scheme(url, allowed_hosts={request.get_host()}):
+        url = "/notes/all/"
+
+    ids = request.POST.getlist("ids")
+    if not ids:
+        messages.warning(request, "Select at least one task")
+        return redirect(url)
+
+    try:
+        apply_batch_operation(
+            request.user, ids, request.POST.get("operation"), request.POST.get("value")
+        )
+    except BatchOperationError as err:
+        return HttpResponseBadRequest(str(err))
+    return redirect(url)
+
+
+@login_required
+def export_notes(request, export_format):
+    """Stream the user entries filtered like in the pages as a file"""
+    try:
+        notes = filter_notes(Note.objects.for_user(request.user), request.GET)
+    except FilterError as err:
+        return HttpResponseBadRequest(str(err))
+
+    iter_export, content_type = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(iter_export(notes), content_type=content_type)
+    filename = f"notes-{datetime.today().strftime('%Y-%m-%d')}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@require_safe
+@cache_control(private=True, max_age=settings.NOTES_FEED_MAX_AGE)
+@condition(etag_func=get_feed_etag, last_modified_func=get_feed_last_modified)
+def calendar_feed(request, token):
+    """
+    Stream the calendar of the user tasks found by the secret token.
+    Calendar apps polling the feed get 304 until the tasks are changed.
+    """
+    state = get_feed_state(request, token)
+    if state is None:
+        raise Http404("Calendar feed not found")
+    return StreamingHttpResponse(
+        iter_ics(get_feed_notes(state["user_id"])),
+        content_type="text/calendar; charset=utf-8",
+    )
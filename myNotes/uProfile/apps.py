@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UprofileConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "uProfile"
+
+    def ready(self):
+        # register signal receivers
+        from . import backends  # noqa: F401
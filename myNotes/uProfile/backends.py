@@ -0,0 +1,67 @@
+"""Define the authentication backend loading users with their profiles"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Profile
+
+User = get_user_model()
+
+USER_CACHE_PREFIX = "auth:user"
+
+
+def get_user_cache():
+    """Returns the cache used for storing users with profiles"""
+    return caches[settings.USER_CACHE_ALIAS]
+
+
+def get_user_cache_key(user_id):
+    """Returns the cache key of the user with the profile"""
+    return f"{USER_CACHE_PREFIX}:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    """Remove the user with the profile from the cache"""
+    key = get_user_cache_key(user_id)
+    get_user_cache().delete(key)
+    # a request running at the same time could cache the old rows before the commit
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: get_user_cache().delete(key))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """Remove the user from the cache when the user is saved or deleted"""
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_user(sender, instance, **kwargs):
+    """Remove the user from the cache when the profile is saved or deleted"""
+    invalidate_cached_user(instance.user_id)
+
+
+class ProfileBackend(ModelBackend):
+    """
+    Authenticate users like ModelBackend, but load the session user
+    with the profile by one query and keep them in the cache between requests
+    until the user or the profile is changed.
+    """
+
+    def get_user(self, user_id):
+        cache = get_user_cache()
+        key = get_user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = User._default_manager.select_related("profile").get(pk=user_id)
+            except User.DoesNotExist:
+                return None
+            cache.set(key, user, timeout=settings.USER_CACHE_TTL)
+        return user if self.user_can_authenticate(user) else None
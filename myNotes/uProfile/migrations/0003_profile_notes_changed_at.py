@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("uProfile", "0002_profile_feed_token"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="notes_changed_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("uProfile", "0003_profile_notes_changed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="api_token",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, null=True, unique=True
+            ),
+        ),
+    ]
@@ -3,13 +3,26 @@ from django.contrib.auth.models import User
 from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
+from utils.models import DirtyFieldsMixin
 
-class Profile(models.Model):
+
+class Profile(DirtyFieldsMixin, models.Model):
     """Model of user profile"""
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     location = models.CharField(max_length=30, blank=True)
     birth_date = models.DateField(null=True, blank=True)
+    # secret token of the calendar feed of the user tasks
+    feed_token = models.CharField(
+        max_length=64, unique=True, null=True, blank=True, editable=False
+    )
+    # secret token of the JSON API clients of the user (see notes.api)
+    api_token = models.CharField(
+        max_length=64, unique=True, null=True, blank=True, editable=False
+    )
+    # last change of the user notes (see notes.conditional)
+    notes_changed_at = models.DateTimeField(default=timezone.now, editable=False)
 
 
 @receiver(post_save, sender=User)
@@ -21,5 +34,7 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
-    """Save user profile"""
-    instance.profile.save()
+    """Save user profile if it was loaded with the user and changed"""
+    # e.g. the update of last_login on login does not load the profile
+    if User.profile.related.is_cached(instance):
+        instance.profile.save()
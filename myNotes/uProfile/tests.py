@@ -1,3 +1,101 @@
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from notes.models import Note
+
+
+def create_test_user(username="test_user", password="password"):
+    """Creates a test user"""
+    return User.objects.create_user(username=username, password=password)
+
+
+class ProfileBackendTestCase(TestCase):
+    """Tests loading of the session user with the profile"""
+
+    def get_user_queries(self, url):
+        """Returns queries of users and profiles made by the request of the url"""
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return [
+            query["sql"]
+            for query in queries
+            if ("auth_user" in query["sql"] or "uProfile_profile" in query["sql"])
+            # the last change of the entries is read by its own query
+            # (see notes.conditional)
+            and not query["sql"].startswith(
+                'SELECT "uProfile_profile"."notes_changed_at"'
+            )
+        ]
+
+    def test_user_is_loaded_with_profile_once(self):
+        """Test that the user and the profile are loaded by one cached query"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+
+        queries = self.get_user_queries("/notes/main/")
+        self.assertEqual(len(queries), 1)
+        self.assertIn("JOIN", queries[0])
+        self.assertEqual(self.get_user_queries("/notes/main/"), [])
+
+    def test_cached_user_is_invalidated_by_changes(self):
+        """Test that changes of the user, the profile and the entries reload them"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        self.client.get("/notes/main/")
+
+        self.client.post(
+            "/profile/",
+            {"first_name": "Changed", "last_name": "", "email": "", "location": "Lviv"},
+        )
+        resp = self.client.get("/profile/")
+        self.assertContains(resp, "Lviv")
+        self.assertEqual(resp.context["user"].first_name, "Changed")
+
+        changed_at = resp.context["user"].profile.notes_changed_at
+        Note.objects.create(title="Test note", user=test_user)
+        self.assertEqual(len(self.get_user_queries("/notes/main/")), 1)
+        resp = self.client.get("/profile/")
+        self.assertGreater(resp.context["user"].profile.notes_changed_at, changed_at)
+
+    def test_inactive_user_is_logged_out(self):
+        """Test that the cached user is not authenticated after deactivation"""
+        test_user = create_test_user()
+        self.client.login(username="test_user", password="password")
+        self.client.get("/notes/main/")
+
+        test_user.is_active = False
+        test_user.save()
+        resp = self.client.get("/notes/main/")
+        self.assertEqual(resp.status_code, 302)
+
+
+class ProfileWritesTestCase(TestCase):
+    """Tests that user saves do not write unchanged profiles"""
+
+    def test_login_does_not_write_profile(self):
+        """Test that the update of last_login does not save the profile"""
+        create_test_user()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.login(username="test_user", password="password")
+        self.assertFalse(
+            [query for query in queries if "uProfile_profile" in query["sql"]]
+        )
+
+    def test_profile_form_writes_changed_fields_once(self):
+        """Test that the profile form updates each changed row once"""
+        create_test_user()
+        self.client.login(username="test_user", password="password")
+        self.client.get("/profile/")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                "/profile/",
+                {"first_name": "", "last_name": "", "email": "", "location": "Lviv"},
+            )
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"location"', updates[0])
+        self.assertNotIn('"birth_date"', updates[0])
@@ -4,7 +4,9 @@
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
 from django.shortcuts import redirect, render
+from django.urls import reverse
 
+from notes.feed import get_feed_token
 from uProfile.forms import ProfileForm, UserForm
 
 
@@ -16,7 +18,9 @@ def update_profile(request):
         user_form = UserForm(request.POST, instance=request.user)
         profile_form = ProfileForm(request.POST, instance=request.user.profile)
         if user_form.is_valid() and profile_form.is_valid():
-            user_form.save()
+            # update only the changed columns of the user, the profile tracks them
+            if user_form.has_changed():
+                user_form.instance.save(update_fields=user_form.changed_data)
             profile_form.save()
             return redirect("main")
     else:
@@ -28,5 +32,8 @@ def update_profile(request):
         {
             "user_form": user_form,
             "profile_form": profile_form,
+            "feed_url": request.build_absolute_uri(
+                reverse("calendar-feed", args=[get_feed_token(request.user.profile)])
+            ),
         },
     )
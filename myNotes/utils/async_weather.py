@@ -0,0 +1,167 @@
+"""Async weather client for the ASGI deployment"""
+import asyncio
+import weakref
+
+import aiohttp
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from utils.utils import (
+    API_KEY,
+    BASE_URL,
+    CityNotFoundError,
+    get_cached_weather_entry,
+    get_weather_cache,
+    get_weather_cache_key,
+    parse_weather,
+    store_weather,
+    weather_breaker,
+)
+
+# sessions are bound to the event loops they were created in
+_sessions = weakref.WeakKeyDictionary()
+
+# the running refreshes of weather info by cache key shared by concurrent requests
+_pending_refreshes = {}
+
+# keeps references to the running background tasks
+_background_tasks = set()
+
+
+def run_in_background(coro):
+    """Starts the task keeping the reference to it until it is done"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def keep_session(session):
+    """
+    Keep the session open until the event loop cancels its tasks on shutdown,
+    so the connections are closed before the loop (e.g. of async_to_sync) is.
+    """
+    try:
+        await asyncio.Future()
+    finally:
+        await session.close()
+
+
+def get_session():
+    """Returns the shared pooled session of the running event loop"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=settings.WEATHER_POOL_SIZE, ttl_dns_cache=300
+            ),
+            timeout=aiohttp.ClientTimeout(total=settings.WEATHER_LATENCY_BUDGET),
+        )
+        _sessions[loop] = session
+        run_in_background(keep_session(session))
+    return session
+
+
+async def close_session():
+    """Closes the shared session of the running event loop"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+async def fetch_weather_async(city="Kyiv"):
+    """Gets and returns weather info within the latency budget"""
+    if not weather_breaker.allow_request():
+        return None
+
+    params = {"q": city, "units": "metric", "appid": API_KEY}
+    try:
+        async with get_session().get(BASE_URL, params=params) as response:
+            data = await response.json(content_type=None)
+        weather_info = parse_weather(data, city)
+    except CityNotFoundError:
+        # the service is fine, the location is wrong
+        weather_breaker.record_success()
+        raise
+    except (
+        aiohttp.ClientError,
+        asyncio.TimeoutError,
+        ValueError,
+        KeyError,
+        ConnectionError,
+    ) as err:
+        weather_breaker.record_failure()
+        print(f"Something went wrong! {err!r}")
+        return None
+
+    weather_breaker.record_success()
+    return weather_info
+
+
+async def refresh_weather_async(city):
+    """Gets weather info from the service and stores it to the cache"""
+    try:
+        weather_info = await fetch_weather_async(city)
+    except CityNotFoundError:
+        # cache misses for unknown cities too
+        await sync_to_async(store_weather, thread_sensitive=False)(
+            city, None, settings.WEATHER_CACHE_NOT_FOUND_TTL
+        )
+        return None
+
+    if weather_info is not None:
+        await sync_to_async(store_weather, thread_sensitive=False)(
+            city, weather_info, settings.WEATHER_CACHE_TTL
+        )
+    return weather_info
+
+
+async def refresh_weather_once_async(city):
+    """
+    Gets weather info by one request for all requests of the location
+    missing in the cache at the same time.
+    """
+    key = get_weather_cache_key(city)
+    task = _pending_refreshes.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = run_in_background(refresh_weather_async(city))
+        _pending_refreshes[key] = task
+
+        def forget(done):
+            if _pending_refreshes.get(key) is done:
+                del _pending_refreshes[key]
+
+        task.add_done_callback(forget)
+    # a cancelled request does not cancel the refresh awaited by the others
+    return await asyncio.shield(task)
+
+
+async def refresh_weather_in_background_async(city):
+    """Starts the single background refresh of stale weather info"""
+    cache = get_weather_cache()
+    lock_key = get_weather_cache_key(city, suffix="lock")
+    if not await cache.aadd(lock_key, True, timeout=settings.WEATHER_CACHE_LOCK_TTL):
+        return
+
+    async def refresh():
+        try:
+            await refresh_weather_async(city)
+        finally:
+            await cache.adelete(lock_key)
+
+    run_in_background(refresh())
+
+
+async def get_weather_async(city="Kyiv"):
+    """Returns cached weather info, refreshing it when it is expired"""
+    entry, is_stale = await sync_to_async(
+        get_cached_weather_entry, thread_sensitive=False
+    )(city)
+
+    if entry is None:
+        return await refresh_weather_once_async(city)
+
+    if is_stale:
+        await refresh_weather_in_background_async(city)
+    return entry["weather"]
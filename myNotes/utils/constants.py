@@ -1,14 +1,23 @@
-WEIGHT_CHOICES = (
-    ('Low', 'Low'),
-    ('Normal', 'Normal'),
-    ('High', 'High'),
-)
-
-TYPE_CHOICES = (
-    ('Note', 'Note'),
-    ('To do', 'To do'),
-    ('Event', 'Event'),
-    ('Holiday', 'Holiday'),
-)
-
-WEEK_DAYS = ['day1', 'day2', 'day3', 'day4', 'day5', 'day6', 'day7']
\ No newline at end of file
+from django.db import models
+
+
+class Weight(models.IntegerChoices):
+    """Weights of entries stored as numbers growing with the priority"""
+    LOW = 1, 'Low'
+    NORMAL = 2, 'Normal'
+    HIGH = 3, 'High'
+
+
+class NoteType(models.IntegerChoices):
+    """Types of entries stored as numbers"""
+    NOTE = 1, 'Note'
+    TODO = 2, 'To do'
+    EVENT = 3, 'Event'
+    HOLIDAY = 4, 'Holiday'
+
+
+WEIGHT_CHOICES = Weight.choices
+
+TYPE_CHOICES = NoteType.choices
+
+WEEK_DAYS = ['day1', 'day2', 'day3', 'day4', 'day5', 'day6', 'day7']
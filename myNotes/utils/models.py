@@ -0,0 +1,69 @@
+"""Define model helpers shared by the apps"""
+
+
+class DirtyFieldsMixin:
+    """
+    Remember values of the fields loaded from the database or saved,
+    so saving a loaded instance updates only the changed fields
+    and saving it without changes does not query the database.
+    Fields with auto_now are updated together with the changed fields.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # deferred fields are missing in field_names
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def remember_field_values(self, field_names=None):
+        """Remember current values of the fields or of all loaded fields"""
+        if field_names is None:
+            fields = self._meta.concrete_fields
+        else:
+            fields = [self._meta.get_field(name) for name in field_names]
+        loaded_values = getattr(self, "_loaded_values", {})
+        for field in fields:
+            if field.attname in self.__dict__:
+                loaded_values[field.attname] = getattr(self, field.attname)
+        self._loaded_values = loaded_values
+
+    def get_dirty_fields(self):
+        """Returns names of the fields changed since they were loaded or saved"""
+        loaded_values = getattr(self, "_loaded_values", {})
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            # deferred fields which were not loaded later are not changed
+            and field.attname in self.__dict__
+            and (
+                field.attname not in loaded_values
+                or loaded_values[field.attname] != getattr(self, field.attname)
+            )
+        ]
+
+    def save(self, *args, **kwargs):
+        if (
+            not args
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+            and not self._state.adding
+            and hasattr(self, "_loaded_values")
+        ):
+            dirty_fields = self.get_dirty_fields()
+            if not dirty_fields:
+                return
+            auto_now_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if getattr(field, "auto_now", False) and field.name not in dirty_fields
+            ]
+            kwargs["update_fields"] = dirty_fields + auto_now_fields
+
+        super().save(*args, **kwargs)
+        self.remember_field_values(kwargs.get("update_fields"))
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self.remember_field_values(fields)
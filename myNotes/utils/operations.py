@@ -0,0 +1,52 @@
+"""Define migration operations shared by the apps"""
+from django.contrib.postgres import operations
+from django.db.migrations import AddIndex, RemoveIndex
+
+
+class AddIndexConcurrently(operations.AddIndexConcurrently):
+    """
+    Create the index by CREATE INDEX CONCURRENTLY on PostgreSQL,
+    so writes to the table are not locked while it is built,
+    and like AddIndex on other databases (e.g. SQLite in development).
+    The migration has to set atomic = False.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+
+class RemoveIndexConcurrently(operations.RemoveIndexConcurrently):
+    """
+    Drop the index by DROP INDEX CONCURRENTLY on PostgreSQL
+    and like RemoveIndex on other databases.
+    The migration has to set atomic = False.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            RemoveIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            RemoveIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
@@ -1,54 +1,240 @@
 """Utils"""
-import json
+import hashlib
+import threading
+import time
 from datetime import date, datetime, timedelta
 
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from django.core.cache import caches
 
 BASE_URL = settings.WEATHER_BASE_URL
 API_KEY = settings.WEATHER_API_KEY
 
+WEATHER_CACHE_PREFIX = "weather"
+WEATHER_CACHE_STATS = ("hits", "stale_hits", "misses")
+
+
+class CityNotFoundError(Exception):
+    """Raised when the weather service does not know the requested city"""
+
+
+class CircuitBreaker:
+    """
+    Fails fast after failure_threshold consecutive failures
+    and lets a single probe request through after cooldown seconds.
+    """
+
+    def __init__(self, failure_threshold, cooldown):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.is_probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """Check if requests are rejected now"""
+        return self.opened_at is not None
+
+    def allow_request(self):
+        """Check if the request may be sent to the service"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.is_probing or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.is_probing = True
+            return True
+
+    def record_success(self):
+        """Close the breaker after the successful request"""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.is_probing = False
+
+    def record_failure(self):
+        """Open the breaker after too many failed requests in a row"""
+        with self._lock:
+            self.failures += 1
+            self.is_probing = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def create_weather_session():
+    """Creates the session keeping connections to the weather service alive"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=settings.WEATHER_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+weather_session = create_weather_session()
+weather_breaker = CircuitBreaker(
+    settings.WEATHER_BREAKER_THRESHOLD, settings.WEATHER_BREAKER_COOLDOWN
+)
+
+
+def get_weather_cache():
+    """Returns the cache used for storing weather info"""
+    return caches[settings.WEATHER_CACHE_ALIAS]
+
+
+def normalize_location(city):
+    """Folds case and whitespace of the location name"""
+    return " ".join(str(city).split()).casefold()
+
+
+def get_weather_cache_key(city, suffix="data"):
+    """Returns the cache key for the location"""
+    location_hash = hashlib.md5(normalize_location(city).encode()).hexdigest()
+    return f"{WEATHER_CACHE_PREFIX}:{suffix}:{location_hash}"
+
+
+def count_weather_cache(stat):
+    """Increments the weather cache counter"""
+    cache = get_weather_cache()
+    key = f"{WEATHER_CACHE_PREFIX}:stats:{stat}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        # the first count or the counter was evicted
+        cache.set(key, 1, timeout=None)
+
+
+def get_weather_cache_stats():
+    """Returns the weather cache hit/miss counters"""
+    cache = get_weather_cache()
+    keys = {
+        f"{WEATHER_CACHE_PREFIX}:stats:{stat}": stat for stat in WEATHER_CACHE_STATS
+    }
+    values = cache.get_many(keys.keys())
+    return {stat: values.get(key, 0) for key, stat in keys.items()}
+
+
+def store_weather(city, weather_info, ttl):
+    """Puts weather info to the cache for ttl seconds and keeps it as stale after that"""
+    entry = {"weather": weather_info, "expires_at": time.time() + ttl}
+    get_weather_cache().set(
+        get_weather_cache_key(city),
+        entry,
+        timeout=ttl + settings.WEATHER_CACHE_STALE_TTL,
+    )
+
+
+def refresh_weather(city):
+    """Gets weather info from the service and stores it to the cache"""
+    try:
+        weather_info = fetch_weather(city)
+    except CityNotFoundError:
+        # cache misses for unknown cities too
+        store_weather(city, None, settings.WEATHER_CACHE_NOT_FOUND_TTL)
+        return None
+
+    if weather_info is not None:
+        store_weather(city, weather_info, settings.WEATHER_CACHE_TTL)
+    return weather_info
+
+
+def refresh_weather_in_background(city):
+    """Starts the single background refresh of stale weather info"""
+    cache = get_weather_cache()
+    lock_key = get_weather_cache_key(city, suffix="lock")
+    if not cache.add(lock_key, True, timeout=settings.WEATHER_CACHE_LOCK_TTL):
+        return
+
+    def refresh():
+        try:
+            refresh_weather(city)
+        finally:
+            cache.delete(lock_key)
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def get_cached_weather_entry(city):
+    """Returns the cached weather entry with its staleness and counts the cache hit or miss"""
+    entry = get_weather_cache().get(get_weather_cache_key(city))
+
+    if entry is None:
+        count_weather_cache("misses")
+        return None, False
+
+    is_stale = entry["expires_at"] < time.time()
+    count_weather_cache("stale_hits" if is_stale else "hits")
+    return entry, is_stale
+
 
 def get_weather(city="Kyiv"):
+    """Returns cached weather info, refreshing it when it is expired"""
+    entry, is_stale = get_cached_weather_entry(city)
+
+    if entry is None:
+        return refresh_weather(city)
+
+    if is_stale:
+        refresh_weather_in_background(city)
+    return entry["weather"]
+
+
+def parse_weather(data, city):
+    """Returns weather info from the weather service response data"""
+    if data["cod"] in [200, "200"]:
+        weather_info = {
+            "location": f'{data["name"]}, {data["sys"]["country"]}',
+            "temp": round(data["main"]["temp"]),
+            "icon": data["weather"][0]["icon"],
+            "feels_like": round(data["main"]["feels_like"]),
+            "description": data["weather"][0]["description"],
+            "wind": {
+                "speed": data["wind"]["speed"],
+                "gust": data["wind"].get("gust", "-"),
+            },
+        }
+
+        return weather_info
+
+    if data["cod"] in [404, "404"]:
+        print(f'City with name "{city}" not found!')
+        raise CityNotFoundError(city)
+
+    raise ConnectionError(
+        f'Something went wrong! Response with code {data["cod"]}: {data.get("message", "")}'
+    )
+
+
+def fetch_weather(city="Kyiv"):
     """Gets and returns weather info"""
-    url = f"{BASE_URL}?q={city}&units=metric&appid={API_KEY}"
+    if not weather_breaker.allow_request():
+        return None
+
+    params = {"q": city, "units": "metric", "appid": API_KEY}
     try:
-        response = requests.get(url, timeout=(10, 10))
-
-        data = json.loads(response.text)
-
-        if data["cod"] in [200, "200"]:
-            weather_info = {
-                "location": f'{data["name"]}, {data["sys"]["country"]}',
-                "temp": round(data["main"]["temp"]),
-                "icon": data["weather"][0]["icon"],
-                "feels_like": round(data["main"]["feels_like"]),
-                "description": data["weather"][0]["description"],
-                "wind": {
-                    "speed": data["wind"]["speed"],
-                    "gust": data["wind"].get("gust", "-"),
-                },
-            }
-
-            return weather_info
-
-        if data["cod"] in [404, "404"]:
-            print(f'City with name "{city}" not found!')
-            get_weather(city="Kyiv")
-            return None
-
-        raise ConnectionError(
-            f'Something went wrong! Response with code {data["cod"]}: {data.get("message", "")}'
-        )
-
-    except ConnectionError as err:
+        response = weather_session.get(BASE_URL, params=params, timeout=(10, 10))
+        weather_info = parse_weather(response.json(), city)
+    except CityNotFoundError:
+        # the service is fine, the location is wrong
+        weather_breaker.record_success()
+        raise
+    except (requests.RequestException, ValueError, KeyError, ConnectionError) as err:
+        weather_breaker.record_failure()
         print(f"Something went wrong! {err}")
+        return None
 
-    return None
+    weather_breaker.record_success()
+    return weather_info
 
 
-def get_last_monday(today_date=date.today()):
+def get_last_monday(today_date=None):
     """Define the date of last Monday"""
+    if today_date is None:
+        today_date = date.today()
+
     current_week_day = datetime.isoweekday(today_date)
     delta_days = 1 - current_week_day
 
@@ -57,3 +243,10 @@ def get_last_monday(today_date=date.today()):
 
     monday_date = today_date + timedelta(days=delta_days)
     return monday_date
+
+
+def get_week_dates(week_count=0, today_date=None):
+    """Define the first and the last dates of the week shifted by week_count from the current one"""
+    start_date = get_last_monday(today_date) + timedelta(days=7 * int(week_count))
+    end_date = start_date + timedelta(days=6)
+    return start_date, end_date